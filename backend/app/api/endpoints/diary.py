@@ -1,45 +1,103 @@
 # app/api/endpoints/diary.py
 
-from datetime import datetime, date, time
+import asyncio
+import base64
+import calendar
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import aclosing
+from datetime import datetime, date
 from pathlib import Path
-from uuid import uuid4
-from typing import List
+from typing import AsyncIterator, Callable, Dict, List, Optional
 
+from anyio import to_thread
 from fastapi import (
     APIRouter,
     Depends,
     UploadFile,
     File,
     Form,
+    Header,
     HTTPException,
+    Query,
+    Request,
+    Response,
 )
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import and_, exists, func, or_, select
 
-from app.db.database import get_db_session
-from app.db.model import Diary
+from app.config import settings
+from app.db.database import AsyncSessionLocal, get_db_session
+from app.db.model import DailyDiary, Diary, to_local_date
 from app.services.ai_generator import (
     generate_one_line_diary,    # OpenAI Vision + GPT 한 줄 일기
     generate_daily_summary,     # (선택) OpenAI 기반 하루 요약 텍스트
+    stream_daily_summary,       # 하루 요약 스트리밍 버전 (SSE)
+)
+from app.services.image_processor import preprocess_image, verify_image
+from app.services.image_derivatives import derivative_urls, schedule_derivatives
+from app.services.one_line_cache import (
+    make_cache_key,
+    get_or_generate_one_line,
+    generate_one_line,          # 일괄 업로드: DB 없이 생성만 (동시 실행용)
+    lookup_many,                # 일괄 업로드: 캐시 조회를 한 번에
+    save_many,                  # 일괄 업로드: 새 결과를 Diary 와 같은 트랜잭션에 저장
+    remember_many,              # 일괄 업로드: commit 이 끝난 새 결과를 LRU 에 반영
 )
 from app.services.daily_diary_generator import (
+    build_summary_bullets,      # 한 줄 일기 -> "1. ~" bullet 요약
     generate_daily_diary,       # KoBART 하루 줄글 일기 생성
+    stream_daily_diary,         # KoBART 하루 줄글 일기 스트리밍 버전 (SSE)
+    clean_generated_text,
+    resolve_preset,             # 요청의 preset -> 실제 사용할 generate 프리셋 이름
+)
+from app.services.job_queue import job_queue
+from app.services.metrics import stage_timer
+from app.services.security import CurrentUser, get_optional_user, resolve_user_id
+from app.services.http_cache import is_not_modified, make_etag, not_modified, set_cache_headers
+from app.services.daily_diary_store import (
+    FINAL_GENERATORS,           # 최종 하루 일기 generator (fast 미리보기 제외)
+    GENERATOR_GPT_SUMMARY,
+    compute_fingerprint,
+    kobart_generator,           # 프리셋별 KoBART 하루 일기 저장 이름
+    get_or_generate_daily,      # 저장된 하루 일기 재사용 / 없으면 생성 후 저장
+    load_current,               # 저장본이 최신이면 그 텍스트 (스트리밍 응답용)
+    save_daily,
+    list_for_day,               # 그날 저장된 하루 일기 (생성하지 않고 조회만)
 )
 
 router = APIRouter(tags=["diaries"])
 
+# job 큐 작업 종류 (GenerationJob.kind)
+JOB_ONE_LINE = "one_line"
+JOB_FULL_DIARY = "full_diary"
+
 
 # ---------- 공통으로 쓸 Pydantic 모델 ----------
 
 class DaySummaryRequest(BaseModel):
     """
     하루 요약/줄글 일기를 생성할 때 공통으로 사용하는 요청 바디 형태.
-    - user_id: 어떤 유저의 일기인지
+    - user_id: 어떤 유저의 일기인지 (Bearer 토큰을 보내면 생략 가능)
     - date: "YYYY-MM-DD" 형식의 날짜 문자열
+    - regenerate: true 면 저장된 결과가 있어도 다시 생성
     """
-    user_id: int
+    user_id: Optional[int] = None
     date: str
+    regenerate: bool = False
+
+
+class FullDiaryRequest(DaySummaryRequest):
+    """
+    KoBART 하루 줄글 일기 요청 바디.
+    - preset: "fast"(미리보기, 가장 빠름) / "standard" / "quality"(beam search, 가장 느림)
+              생략하면 서버 설정(KOBART_PRESET)
+    """
+    preset: Optional[str] = None
 
 
 # ---------- 공통 상수 / 디렉터리 설정 ----------
@@ -59,76 +117,217 @@ MEDIA_DIR.mkdir(exist_ok=True)
 IMAGES_DIR.mkdir(exist_ok=True)
 
 
-def _generate_filename(original_name: str) -> str:
+def _generate_filename(original_name: str, content_hash: str) -> str:
     """
     업로드된 파일 이름에서 확장자를 유지하면서
-    'YYYYMMDD_HHMMSS_랜덤8글자.ext' 형태의 고유한 파일명 생성
+    '원본 바이트 sha256.ext' 형태의 파일명 생성.
+    같은 사진을 다시 올리면 같은 파일명이 나오므로 디스크에는 한 번만 저장됨.
     """
-    ext = Path(original_name).suffix  # .jpg, .png ...
-    ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    uid = uuid4().hex[:8]
-    return f"{ts}_{uid}{ext}"
+    ext = Path(original_name or "").suffix.lower() or ".jpg"  # .jpg, .png ...
+    return f"{content_hash}{ext}"
+
+
+def _finalize_upload(tmp_path: str, filename: str) -> Path:
+    """임시 파일을 해시 파일명으로 옮김. 이미 있는 사진이면 임시 파일만 지움."""
+    file_path = IMAGES_DIR / filename
+    if file_path.exists():
+        os.unlink(tmp_path)
+    else:
+        os.replace(tmp_path, file_path)
+    return file_path
+
+
+async def _store_upload(photo: UploadFile) -> tuple[Path, str]:
+    """
+    업로드 파일을 UPLOAD_CHUNK_SIZE 단위로 읽어 media/images/ 의 임시 파일에 쓰면서
+    sha256 을 같이 계산하고, 이미지로 읽히는지 확인한 뒤 '해시.ext' 파일명으로 옮김.
+    (이미지가 아니면 400, 임시 파일은 지워져서 원본 폴더에 남지 않음)
+    원본 전체를 메모리에 올리지 않고, 디스크 쓰기는 쓰레드 풀에서 실행.
+    반환: (저장된 파일 경로, 프론트에서 쓸 image_url)
+    """
+    max_bytes = settings.UPLOAD_MAX_BYTES
+    # 클라이언트가 크기를 알려준 경우 읽기 전에 바로 거절
+    if photo.size is not None and photo.size > max_bytes:
+        raise HTTPException(status_code=413, detail="이미지 파일이 너무 큽니다.")
+
+    h = hashlib.sha256()
+    total = 0
+    fd, tmp_path = tempfile.mkstemp(dir=IMAGES_DIR, prefix=".upload-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                chunk = await photo.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > max_bytes:
+                    raise HTTPException(status_code=413, detail="이미지 파일이 너무 큽니다.")
+                h.update(chunk)
+                await to_thread.run_sync(f.write, chunk)
+
+        if total == 0:
+            raise HTTPException(status_code=400, detail="빈 이미지 파일입니다.")
+        await verify_image(tmp_path)
+
+        filename = _generate_filename(photo.filename, h.hexdigest())
+        file_path = await to_thread.run_sync(_finalize_upload, tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    # 프론트에서 사용할 이미지 URL (StaticFiles로 /media 마운트되어 있음)
+    return file_path, f"/media/images/{filename}"
+
+
+def _diary_to_dict(d: Diary) -> dict:
+    return {
+        "id": d.id,
+        "user_id": d.user_id,
+        "content": d.content,
+        "image_url": d.image_url,  # "/media/images/xxx.jpg"
+        **derivative_urls(d.image_url),  # thumbnail_url / medium_url
+        "created_at": d.created_at.isoformat(),
+    }
+
+
+async def _create_diary_record(
+    db: AsyncSession,
+    user_id: int,
+    image_path: Path,
+    image_url: str,
+    job_id: Optional[str] = None,
+) -> dict:
+    """
+    한 줄 일기를 생성(또는 캐시에서 재사용)하고 Diary 레코드를 저장.
+    job_id 가 있으면 그 job 의 succeeded 상태도 Diary 와 같은 트랜잭션으로 저장
+    (commit 뒤에 워커가 취소돼도 job 이 다시 실행되어 Diary 가 중복 생성되지 않도록).
+    """
+    # 저장된 원본 파일에서 바로 비전 호출용으로 축소/재인코딩
+    # (EXIF 회전 포함, 쓰레드 풀에서 실행 - 메모리에는 축소본만 남음)
+    with stage_timer("image_preprocess"):
+        prepared = await preprocess_image(image_path)
+    # 디코딩되는 사진만 목록/캘린더용 축소본을 백그라운드에서 생성
+    schedule_derivatives(image_url)
+
+    # GPT로 한 줄 일기 생성 (같은 사진/프롬프트면 캐시 결과 재사용)
+    cache_key = make_cache_key(prepared.data, GPT_USER_PROMPT, prepared.mime_type)
+    with stage_timer("one_line_generate"):
+        one_line_diary, _ = await get_or_generate_one_line(
+            db,
+            cache_key,
+            lambda: generate_one_line_diary(
+                prepared.data,
+                GPT_USER_PROMPT,
+                mime_type=prepared.mime_type,
+            ),
+        )
+
+    # DB에 Diary 레코드 저장
+    created_at = datetime.utcnow()
+    new_diary = Diary(
+        user_id=user_id,
+        content=one_line_diary,
+        image_url=image_url,
+        created_at=created_at,
+        local_date=to_local_date(created_at),
+    )
+    db.add(new_diary)
+    with stage_timer("diary_db_commit"):
+        await db.flush()  # id 할당
+        diary = _diary_to_dict(new_diary)
+        if job_id is not None:
+            await job_queue.mark_succeeded(db, job_id, _one_line_job_result(diary))
+        await db.commit()
+
+    return diary
+
+
+def _one_line_job_result(diary: dict) -> dict:
+    return {"status": "success", "diary": diary}
+
+
+async def _run_one_line_job(db: AsyncSession, job_id: str, payload: dict) -> dict:
+    """job 워커에서 실행: 저장해 둔 원본 이미지로 한 줄 일기 생성."""
+    image_path = IMAGES_DIR / Path(payload["image_url"]).name
+    diary = await _create_diary_record(
+        db, payload["user_id"], image_path, payload["image_url"], job_id=job_id
+    )
+    return _one_line_job_result(diary)
+
+
+def _job_accepted(job, created: bool) -> JSONResponse:
+    """job 모드 응답: 바로 job_id 를 돌려주고, 결과는 /jobs/{job_id} 로 조회."""
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": job.status,
+            "job_id": job.id,
+            "created": created,
+            "status_url": f"/jobs/{job.id}",
+            "events_url": f"/jobs/{job.id}/events",
+        },
+    )
 
 
 # 1) 이미지 업로드 + 한 줄 일기 생성
 
 @router.post("/diaries/")
 async def create_diary(
-    user_id: int = Form(...),        # 프론트에서 넘어오는 user_id (정수)
+    user_id: Optional[int] = Form(None),  # 프론트에서 넘어오는 user_id (토큰을 보내면 생략 가능)
     photo: UploadFile = File(...),   # multipart/form-data 의 파일 필드
+    job: bool = Query(False),        # true 면 job 으로 등록하고 바로 job_id 반환
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: AsyncSession = Depends(get_db_session),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
 ):
     """
     1. 사진 파일을 업로드 받고
-    2. OpenAI Vision + GPT로 한 줄 일기를 생성한 뒤
-    3. media/images/ 폴더에 이미지를 저장하고
+    2. media/images/ 폴더에 원본 이미지를 저장하고
+    3. 비전 호출용으로 축소/재인코딩한 이미지로
+       OpenAI Vision + GPT 한 줄 일기를 생성한 뒤
     4. Diary 테이블에 (user_id, content, image_url, created_at)을 저장.
 
+    ?job=true 이면 2번까지만 하고 202 + job_id 를 바로 반환.
+    결과는 GET /jobs/{job_id} (또는 /wait, /events) 로 받는다.
+    같은 Idempotency-Key 헤더로 재시도하면 새로 만들지 않고 기존 job 을 돌려준다.
+
+    Authorization: Bearer 토큰을 보내면 토큰의 사용자로 저장한다.
+    (user_id 를 같이 보내는 경우 토큰의 사용자와 다르면 403)
+
     프론트는 응답으로 넘어오는 `image_url`을 그대로 사용해서
     BASE_URL + image_url 형태로 이미지를 보여줄 수 있다.
+    목록/캘린더 타일에는 `thumbnail_url`, 상세 화면에는 `medium_url` 을 쓰면 된다.
     """
     try:
-        # 1) 이미지 바이트 읽기
-        image_bytes = await photo.read()
-
-        if not image_bytes:
-            raise HTTPException(status_code=400, detail="빈 이미지 파일입니다.")
-
-        # 2) GPT로 한 줄 일기 생성
-        one_line_diary = await generate_one_line_diary(
-            image_bytes,
-            GPT_USER_PROMPT,
-        )
-
-        # 3) 이미지 파일을 서버 로컬 디스크에 저장
-        filename = _generate_filename(photo.filename)
-        file_path = IMAGES_DIR / filename
-        with open(file_path, "wb") as f:
-            f.write(image_bytes)
-
-        # 프론트에서 사용할 이미지 URL (StaticFiles로 /media 마운트되어 있음)
-        image_url = f"/media/images/{filename}"
-
-        # 4) DB에 Diary 레코드 저장
-        new_diary = Diary(
-            user_id=user_id,
-            content=one_line_diary,
-            image_url=image_url,
-            created_at=datetime.utcnow(),
-        )
-        db.add(new_diary)
-        await db.commit()
-        await db.refresh(new_diary)
+        user_id = resolve_user_id(current_user, user_id)
+
+        # job 모드 재시도면 업로드 처리 없이 기존 job 반환
+        if job and idempotency_key:
+            existing = await job_queue.find(db, user_id, idempotency_key)
+            if existing is not None:
+                return _job_accepted(existing, False)
+
+        # 1~2) 업로드를 나눠 읽으면서 서버 로컬 디스크에 저장 (이미 있는 사진이면 생략)
+        with stage_timer("upload_store"):
+            image_path, image_url = await _store_upload(photo)
+
+        if job:
+            queued, created = await job_queue.enqueue(
+                db,
+                JOB_ONE_LINE,
+                user_id,
+                {"user_id": user_id, "image_url": image_url},
+                idempotency_key=idempotency_key,
+            )
+            return _job_accepted(queued, created)
+
+        # 3~4) 한 줄 일기 생성 + DB 저장
+        diary = await _create_diary_record(db, user_id, image_path, image_url)
 
         return {
             "status": "success",
-            "diary": {
-                "id": new_diary.id,
-                "user_id": new_diary.user_id,
-                "content": new_diary.content,
-                "image_url": new_diary.image_url,
-                "created_at": new_diary.created_at.isoformat(),
-            },
+            "diary": diary,
         }
 
     except HTTPException:
@@ -139,102 +338,468 @@ async def create_diary(
         raise HTTPException(status_code=500, detail=f"Diary creation failed: {e}")
 
 
+# 1-1) 여러 장 일괄 업로드 + 한 줄 일기 생성
+
+async def _discard_upload(db: AsyncSession, image_path: Path, image_url: str) -> None:
+    """전처리에 실패한 사진의 원본 삭제 (같은 사진을 쓰는 Diary 가 이미 있으면 남겨둠)."""
+    in_use = await db.scalar(select(exists().where(Diary.image_url == image_url)))
+    if not in_use:
+        await to_thread.run_sync(lambda: image_path.unlink(missing_ok=True))
+
+
+def _photo_error(index: int, photo: UploadFile, e: BaseException) -> dict:
+    if isinstance(e, HTTPException):
+        error = {"status_code": e.status_code, "detail": e.detail}
+    else:
+        error = {"status_code": 500, "detail": f"Diary creation failed: {e}"}
+    return {"index": index, "filename": photo.filename, "status": "error", "error": error}
+
+
+@router.post("/diaries/batch")
+async def create_diaries_batch(
+    user_id: Optional[int] = Form(None),    # 토큰을 보내면 생략 가능
+    photos: List[UploadFile] = File(...),    # 같은 필드 이름(photos)으로 여러 장
+    db: AsyncSession = Depends(get_db_session),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
+):
+    """
+    하루 끝에 사진 여러 장을 한 번에 올릴 때 쓰는 POST /diaries/ 의 일괄 버전.
+
+    1. 사진들을 차례로 media/images/ 에 저장
+    2. 비전 호출용 전처리 + 한 줄 일기 생성을 UPLOAD_BATCH_CONCURRENCY 장씩 동시에 실행
+       (캐시 조회는 IN 쿼리 한 번, 캐시에 있는 사진은 생성하지 않음)
+    3. 성공한 사진들의 Diary 를 한 트랜잭션으로 저장 (commit 1번)
+
+    사진별 성공/실패를 업로드 순서대로 results 에 담아 돌려준다.
+    일부가 실패해도 나머지는 저장되고 응답 코드는 200
+    (status: 모두 성공 "success" / 일부 실패 "partial" / 모두 실패 "error").
+    """
+    try:
+        user_id = resolve_user_id(current_user, user_id)
+
+        if len(photos) > settings.UPLOAD_BATCH_MAX_FILES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"한 번에 최대 {settings.UPLOAD_BATCH_MAX_FILES}장까지 올릴 수 있습니다.",
+            )
+
+        results: List[Optional[dict]] = [None] * len(photos)
+
+        # 1) 업로드 저장 (요청 본문은 순서대로 읽음)
+        stored: Dict[int, tuple[Path, str]] = {}
+        with stage_timer("upload_store"):
+            for i, photo in enumerate(photos):
+                try:
+                    stored[i] = await _store_upload(photo)
+                except HTTPException as e:
+                    results[i] = _photo_error(i, photo, e)
+
+        semaphore = asyncio.Semaphore(max(1, settings.UPLOAD_BATCH_CONCURRENCY))
+
+        async def _prepare(i: int):
+            async with semaphore:
+                with stage_timer("image_preprocess"):
+                    return await preprocess_image(stored[i][0])
+
+        # 2) 전처리 (동시에) -> 캐시 키 -> 캐시 조회 (한 번에)
+        indices = list(stored)
+        outcomes = await asyncio.gather(*(_prepare(i) for i in indices), return_exceptions=True)
+        prepared = {}
+        for i, outcome in zip(indices, outcomes):
+            if isinstance(outcome, BaseException):
+                results[i] = _photo_error(i, photos[i], outcome)
+                await _discard_upload(db, *stored[i])
+            else:
+                prepared[i] = outcome
+                # 디코딩되는 사진만 목록/캘린더용 축소본을 백그라운드에서 생성
+                schedule_derivatives(stored[i][1])
+
+        keys = {
+            i: make_cache_key(p.data, GPT_USER_PROMPT, p.mime_type) for i, p in prepared.items()
+        }
+        cached = await lookup_many(db, list(keys.values()))
+
+        # 같은 사진이 여러 장이면 한 번만 생성
+        first_index: Dict[str, int] = {}
+        for i, key in keys.items():
+            first_index.setdefault(key, i)
+
+        async def _one_line(key: str) -> tuple[str, bool]:
+            if key in cached:
+                return cached[key], False
+            p = prepared[first_index[key]]
+            async with semaphore:
+                with stage_timer("one_line_generate"):
+                    return await generate_one_line(
+                        key,
+                        lambda: generate_one_line_diary(
+                            p.data,
+                            GPT_USER_PROMPT,
+                            mime_type=p.mime_type,
+                        ),
+                    )
+
+        # 3) 캐시에 없는 사진만 한 줄 일기 생성 (동시에)
+        unique_keys = list(first_index)
+        generated = dict(zip(
+            unique_keys,
+            await asyncio.gather(*(_one_line(k) for k in unique_keys), return_exceptions=True),
+        ))
+
+        # 4) 성공한 사진들의 Diary + 새 캐시 항목을 한 트랜잭션으로 저장
+        new_diaries: List[tuple[int, Diary]] = []
+        new_cache: Dict[str, str] = {}
+        for i in prepared:
+            outcome = generated[keys[i]]
+            if isinstance(outcome, BaseException):
+                results[i] = _photo_error(i, photos[i], outcome)
+                continue
+            content, is_new = outcome
+            if is_new:
+                new_cache[keys[i]] = content
+            created_at = datetime.utcnow()
+            new_diaries.append((i, Diary(
+                user_id=user_id,
+                content=content,
+                image_url=stored[i][1],
+                created_at=created_at,
+                local_date=to_local_date(created_at),
+            )))
+
+        if new_diaries:
+            db.add_all([d for _, d in new_diaries])
+            with stage_timer("diary_db_commit"):
+                await save_many(db, new_cache)
+                # flush 로 id 를 받은 뒤 commit (행마다 refresh 하지 않음)
+                await db.flush()
+                saved = [(i, _diary_to_dict(d)) for i, d in new_diaries]
+                await db.commit()
+            # DB 에 들어간 뒤에만 LRU 에 반영 (commit 실패 시 LRU 와 DB 가 어긋나지 않게)
+            remember_many(new_cache)
+            for i, diary in saved:
+                results[i] = {
+                    "index": i,
+                    "filename": photos[i].filename,
+                    "status": "success",
+                    "diary": diary,
+                }
+
+        succeeded = len(new_diaries)
+        failed = len(photos) - succeeded
+        return {
+            "status": "success" if failed == 0 else ("partial" if succeeded else "error"),
+            "total": len(photos),
+            "succeeded": succeeded,
+            "failed": failed,
+            "results": results,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Diary batch creation failed: {e}")
+
+
+# 목록 조회에서 선택할 수 있는 컬럼 (fields=id,content,... 로 일부만 요청 가능)
+LIST_FIELDS = {
+    "id": Diary.id,
+    "user_id": Diary.user_id,
+    "content": Diary.content,
+    "image_url": Diary.image_url,
+    "created_at": Diary.created_at,
+}
+MAX_PAGE_SIZE = 200
+
+
+def _encode_cursor(created_at: datetime, diary_id: int) -> str:
+    """(created_at, id) 를 클라이언트가 그대로 돌려보낼 불투명한 문자열로 인코딩."""
+    raw = json.dumps([created_at.isoformat(), diary_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, diary_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(diary_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+
+
 # 2) 유저별 일기 리스트 조회
 
 @router.get("/diaries/")
 async def list_diaries(
-    user_id: int,
+    request: Request,
+    response: Response,
+    user_id: Optional[int] = None,      # Bearer 토큰을 보내면 생략 가능
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    start_date: Optional[str] = None,   # "YYYY-MM-DD" (포함)
+    end_date: Optional[str] = None,     # "YYYY-MM-DD" (포함)
+    fields: Optional[str] = None,       # 예: "id,image_url,created_at"
     db: AsyncSession = Depends(get_db_session),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
 ):
     """
     특정 user_id 의 Diary들을 `created_at` 최신순으로 반환.
-    (나중에 페이지네이션이 필요하면 limit/offset 추가 가능)
+
+    - limit 을 주면 (created_at, id) 기준 keyset 페이지네이션.
+      다음 페이지가 있으면 `X-Next-Cursor` 응답 헤더에 cursor 를 넣어주고,
+      다음 요청에서 ?cursor=... 로 그대로 넘기면 이어서 조회.
+      (limit 을 안 주면 기존처럼 전체 목록)
+    - start_date / end_date 로 날짜 범위 필터.
+    - fields 로 필요한 컬럼만 요청 가능 (ORM 객체를 만들지 않고 해당 컬럼만 SELECT).
+      image_url 을 요청하면 축소본 URL(thumbnail_url, medium_url)도 함께 반환.
+    - ETag / Last-Modified 를 내려주고, If-None-Match / If-Modified-Since 가
+      최신이면 목록을 조회하지 않고 304 로 응답.
     """
     try:
+        user_id = resolve_user_id(current_user, user_id)
+
+        if fields:
+            names = [f.strip() for f in fields.split(",") if f.strip()]
+            unknown = [f for f in names if f not in LIST_FIELDS]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"알 수 없는 필드입니다: {unknown}")
+        else:
+            names = list(LIST_FIELDS)
+
+        # cursor 계산에 필요한 created_at, id 는 항상 함께 조회
+        columns = {name: LIST_FIELDS[name] for name in names}
+        columns.setdefault("created_at", Diary.created_at)
+        columns.setdefault("id", Diary.id)
+
+        conditions = [Diary.user_id == user_id]
+        if start_date:
+            conditions.append(Diary.local_date >= _parse_date(start_date))
+        if end_date:
+            conditions.append(Diary.local_date <= _parse_date(end_date))
+
+        # 조건부 요청 검증: 개수 + 마지막 id/created_at 만 보는 인덱스 집계 한 번
+        # (Diary 는 수정되지 않으므로 추가/삭제가 있으면 이 값이 바뀜)
+        count, max_id, last_modified = (
+            await db.execute(
+                select(func.count(Diary.id), func.max(Diary.id), func.max(Diary.created_at))
+                .where(*conditions)
+            )
+        ).one()
+        etag = make_etag("diaries", user_id, request.url.query, count, max_id, last_modified)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(etag, last_modified)
+        set_cache_headers(response, etag, last_modified)
+
         stmt = (
-            select(Diary)
-            .where(Diary.user_id == user_id)
-            .order_by(Diary.created_at.desc())
+            select(*[col.label(name) for name, col in columns.items()])
+            .where(*conditions)
+            .order_by(Diary.created_at.desc(), Diary.id.desc())
         )
-        result = await db.execute(stmt)
-        diaries: List[Diary] = result.scalars().all()
 
-        return [
-            {
-                "id": d.id,
-                "user_id": d.user_id,
-                "content": d.content,
-                "image_url": d.image_url,  # "/media/images/xxx.jpg"
-                "created_at": d.created_at.isoformat(),
-            }
-            for d in diaries
-        ]
+        if cursor:
+            cursor_created_at, cursor_id = _decode_cursor(cursor)
+            stmt = stmt.where(
+                or_(
+                    Diary.created_at < cursor_created_at,
+                    and_(Diary.created_at == cursor_created_at, Diary.id < cursor_id),
+                )
+            )
 
+        if limit is not None:
+            # 한 개 더 읽어서 다음 페이지가 있는지 확인
+            stmt = stmt.limit(limit + 1)
+
+        result = await db.execute(stmt)
+        rows = result.mappings().all()
+
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            response.headers["X-Next-Cursor"] = _encode_cursor(last["created_at"], last["id"])
+
+        items = []
+        for row in rows:
+            item = {name: row[name] for name in names}
+            if "created_at" in item:
+                item["created_at"] = item["created_at"].isoformat()
+            if "image_url" in item:
+                item.update(derivative_urls(item["image_url"]))
+            items.append(item)
+        return items
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Diary list failed: {e}")
 
 
-# 공통: 날짜 문자열을 파싱해서 하루의 시작/끝 datetime으로 바꾸는 헬퍼
-def _parse_date_range(date_str: str) -> tuple[datetime, datetime, date]:
-    """
-    "YYYY-MM-DD" 문자열을 받아서
-    - 해당 날짜의 00:00:00 (time.min)
-    - 해당 날짜의 23:59:59.999999 (time.max)
-    를 반환.
-    """
+# 공통: "YYYY-MM-DD" 날짜 문자열을 파싱하는 헬퍼
+def _parse_date(date_str: str) -> date:
+    """형식이 틀리면 400."""
     try:
-        target_date = date.fromisoformat(date_str)
+        return date.fromisoformat(date_str)
     except ValueError:
         raise HTTPException(status_code=400, detail="날짜 형식은 YYYY-MM-DD 이어야 합니다.")
 
-    start_dt = datetime.combine(target_date, time.min)
-    end_dt = datetime.combine(target_date, time.max)
-    return start_dt, end_dt, target_date
+
+def _parse_preset(preset: Optional[str]) -> str:
+    """모르는 프리셋 이름이면 400."""
+    try:
+        return resolve_preset(preset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# 공통: 특정 user_id, 날짜에 해당하는 Diary들을 시간순으로 조회하는 헬퍼
+async def _fetch_day_diaries(
+    db: AsyncSession, user_id: int, date_str: str
+) -> tuple[List[Diary], date]:
+    """해당 날짜의 Diary 목록과 날짜를 반환. 하나도 없으면 404."""
+    target_date = _parse_date(date_str)
+
+    # (user_id, local_date) 인덱스를 타는 equality 조회
+    stmt = (
+        select(Diary)
+        .where(Diary.user_id == user_id)
+        .where(Diary.local_date == target_date)
+        .order_by(Diary.created_at.asc())
+    )
+    with stage_timer("day_fetch"):
+        result = await db.execute(stmt)
+        diaries: List[Diary] = result.scalars().all()
+
+    if not diaries:
+        raise HTTPException(status_code=404, detail="해당 날짜에 일기가 없습니다.")
+
+    return diaries, target_date
+
+
+# 공통: OpenAI 기반 하루 요약 (저장본이 있고 그날 일기가 그대로면 재사용)
+async def _summarize_day(
+    db: AsyncSession, user_id: int, date_str: str, regenerate: bool
+) -> dict:
+    diaries, target_date = await _fetch_day_diaries(db, user_id, date_str)
+    one_lines = [d.content for d in diaries]
+
+    summary, cached = await get_or_generate_daily(
+        db,
+        user_id,
+        target_date,
+        GENERATOR_GPT_SUMMARY,
+        diaries,
+        lambda: generate_daily_summary(one_lines, date_str),
+        regenerate=regenerate,
+    )
+
+    return _summary_result(user_id, date_str, one_lines, summary, cached)
+
+
+def _summary_result(
+    user_id: int, date_str: str, one_lines: List[str], summary: str, cached: bool
+) -> dict:
+    return {
+        "status": "success",
+        "user_id": user_id,
+        "date": date_str,
+        "summary": summary,
+        "source_count": len(one_lines),
+        "cached": cached,
+    }
+
+
+# 공통: 하루 일기 생성 결과를 토큰 단위로 흘려보내는 SSE 응답
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _replay(text: str) -> AsyncIterator[str]:
+    """저장본을 재사용할 때: 전체 텍스트를 조각 하나로."""
+    yield text
+
+
+async def _stream_day_generation(
+    db: AsyncSession,
+    user_id: int,
+    date_str: str,
+    regenerate: bool,
+    generator: str,
+    stream: Callable[[List[str]], AsyncIterator[str]],
+    build_result: Callable[[List[str], str, bool], dict],
+    clean: Callable[[str], str] = str.strip,
+) -> StreamingResponse:
+    """
+    text/event-stream 응답:
+      - event: token -> {"text": "..."}       생성되는 텍스트 조각 (저장본 재사용이면 전체 1번)
+      - event: done  -> 일반(비스트리밍) 응답과 같은 JSON, 새로 만든 경우 저장까지 끝난 뒤 전송
+      - event: error -> {"status_code", "detail"} 도중 실패 (응답 코드는 이미 200 으로 나간 뒤라서)
+
+    날짜 형식 오류 / 그날 일기 없음 같은 에러는 스트림을 열기 전에 일반 4xx 로 응답.
+    클라이언트가 중간에 끊으면 생성도 멈추고 저장하지 않음.
+    """
+    diaries, target_date = await _fetch_day_diaries(db, user_id, date_str)
+    one_lines = [d.content for d in diaries]
+    fingerprint = compute_fingerprint(diaries)
+
+    stored = None
+    if not regenerate:
+        stored = await load_current(db, user_id, target_date, generator, fingerprint)
+
+    async def _finish(text: str) -> dict:
+        if stored is not None:
+            return build_result(one_lines, stored, True)
+
+        content = clean(text)
+        # 요청 세션은 응답 스트림보다 먼저 닫힐 수 있으므로 저장용 세션을 따로 엶
+        async with AsyncSessionLocal() as session:
+            await save_daily(
+                session, user_id, target_date, generator, fingerprint, len(one_lines), content
+            )
+        return build_result(one_lines, content, False)
+
+    async def _events():
+        chunks = _replay(stored) if stored is not None else stream(one_lines)
+        parts: List[str] = []
+        try:
+            async with aclosing(chunks):
+                async for text in chunks:
+                    parts.append(text)
+                    yield _sse("token", {"text": text})
+            result = await _finish("".join(parts))
+        except HTTPException as e:
+            yield _sse("error", {"status_code": e.status_code, "detail": e.detail})
+            return
+        except Exception as e:
+            yield _sse("error", {"status_code": 500, "detail": f"Streaming generation failed: {e}"})
+            return
+        yield _sse("done", result)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # 3) 하루 요약 줄글 일기 (OpenAI 기반) - Form 버전
 
 @router.post("/diaries/summary")
 async def summarize_diaries_for_day(
-    user_id: int = Form(...),
+    user_id: Optional[int] = Form(None),  # Bearer 토큰을 보내면 생략 가능
     date_str: str = Form(...),  # 예: "2025-12-09"
+    regenerate: bool = Form(False),
     db: AsyncSession = Depends(get_db_session),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
 ):
     """
     - 특정 user_id, 날짜에 해당하는 Diary들의 content를 모아서
     - OpenAI GPT에게 하루 요약 줄글 일기를 생성 요청.
     - 요청은 multipart/form-data (Form 필드) 방식.
+    - 같은 날 한 줄 일기가 바뀌지 않았으면 저장된 요약을 그대로 반환
+      (regenerate=true 면 강제로 다시 생성).
     """
     try:
-        # 날짜 범위 계산
-        start_dt, end_dt, _ = _parse_date_range(date_str)
-
-        # 해당 날짜의 Diary 조회
-        stmt = (
-            select(Diary)
-            .where(Diary.user_id == user_id)
-            .where(Diary.created_at >= start_dt)
-            .where(Diary.created_at <= end_dt)
-            .order_by(Diary.created_at.asc())
-        )
-        result = await db.execute(stmt)
-        diaries: List[Diary] = result.scalars().all()
-
-        if not diaries:
-            raise HTTPException(status_code=404, detail="해당 날짜에 일기가 없습니다.")
-
-        one_lines = [d.content for d in diaries]
-
-        # OpenAI GPT 기반 요약 (옵션 기능)
-        summary = await generate_daily_summary(one_lines, date_str)
-
-        return {
-            "status": "success",
-            "user_id": user_id,
-            "date": date_str,
-            "summary": summary,
-            "source_count": len(one_lines),
-        }
+        user_id = resolve_user_id(current_user, user_id)
+        return await _summarize_day(db, user_id, date_str, regenerate)
 
     except HTTPException:
         raise
@@ -247,125 +812,396 @@ async def summarize_diaries_for_day(
 @router.post("/diaries/summary-json")
 async def summarize_diaries_for_day_json(
     payload: DaySummaryRequest,              # JSON Body 전체를 한 번에 받음
+    stream: bool = Query(False),             # true 면 생성되는 텍스트를 SSE 로 바로바로 전송
     db: AsyncSession = Depends(get_db_session),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
 ):
     """
     JSON Body 예시:
         {
           "user_id": 1,
-          "date": "2025-12-09"
+          "date": "2025-12-09",
+          "regenerate": false
         }
 
     동작은 /diaries/summary 와 동일하지만
     content-type 이 application/json 인 버전.
     (안드로이드에서 Retrofit @Body 로 보내기 편함)
+
+    ?stream=true 이면 text/event-stream 으로 요약 텍스트를 생성되는 대로 보내고,
+    마지막 `event: done` 에 일반 응답과 같은 JSON 을 담아 보낸다.
     """
     try:
-        user_id = payload.user_id
-        date_str = payload.date
+        user_id = resolve_user_id(current_user, payload.user_id)
+
+        if stream:
+            return await _stream_day_generation(
+                db,
+                user_id,
+                payload.date,
+                payload.regenerate,
+                GENERATOR_GPT_SUMMARY,
+                lambda one_lines: stream_daily_summary(one_lines, payload.date),
+                lambda one_lines, summary, cached: _summary_result(
+                    user_id, payload.date, one_lines, summary, cached
+                ),
+            )
+
+        return await _summarize_day(db, user_id, payload.date, payload.regenerate)
 
-        # 날짜 범위 계산
-        start_dt, end_dt, _ = _parse_date_range(date_str)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Diary summary (json) failed: {e}")
 
-        # 해당 날짜의 Diary 조회
-        stmt = (
-            select(Diary)
-            .where(Diary.user_id == user_id)
-            .where(Diary.created_at >= start_dt)
-            .where(Diary.created_at <= end_dt)
-            .order_by(Diary.created_at.asc())
-        )
-        result = await db.execute(stmt)
-        diaries: List[Diary] = result.scalars().all()
 
-        if not diaries:
-            raise HTTPException(status_code=404, detail="해당 날짜에 일기가 없습니다.")
+# 공통: KoBART 하루 줄글 일기 (저장본이 있고 그날 일기가 그대로면 재사용)
+async def _full_daily_diary(
+    db: AsyncSession, user_id: int, date_str: str, regenerate: bool, preset: str
+) -> dict:
+    # 해당 날짜의 Diary 조회
+    diaries, target_date = await _fetch_day_diaries(db, user_id, date_str)
 
-        one_lines = [d.content for d in diaries]
+    # 한 줄 일기 텍스트만 추출
+    one_lines = [d.content for d in diaries]
 
-        # OpenAI GPT 기반 요약 (옵션 기능)
-        summary = await generate_daily_summary(one_lines, date_str)
+    async def _generate() -> str:
+        # KoBART 하루 줄글 일기 생성 (heavy 연산은 daily_diary_generator 내부에서 thread pool로 실행)
+        # (배칭 엔진 큐 대기 시간 포함)
+        with stage_timer("kobart_request"):
+            gen_result = await generate_daily_diary(one_lines, preset)
+        return gen_result["generated_diary"]
 
-        return {
-            "status": "success",
-            "user_id": user_id,
-            "date": date_str,
-            "summary": summary,
-            "source_count": len(one_lines),
-        }
+    full_diary, cached = await get_or_generate_daily(
+        db,
+        user_id,
+        target_date,
+        kobart_generator(preset),
+        diaries,
+        _generate,
+        regenerate=regenerate,
+    )
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Diary summary (json) failed: {e}")
+    return _full_diary_result(user_id, date_str, one_lines, full_diary, cached, preset)
+
+
+def _full_diary_result(
+    user_id: int,
+    date_str: str,
+    one_lines: List[str],
+    full_diary: str,
+    cached: bool,
+    preset: str,
+) -> dict:
+    # 모델 입력으로 쓰는 중간 요약 정보 (가벼운 문자열 처리라 매번 다시 계산)
+    summary_info = build_summary_bullets(one_lines)
+
+    return {
+        "status": "success",
+        "user_id": user_id,
+        "date": date_str,
+        # 모델이 사용한 중간 요약 정보들
+        "bullet_lines": summary_info["bullet_lines"],           # ["1. ...", "2. ...", ...]
+        "combined_summary": summary_info["combined_summary"],   # bullet들을 합친 문자열
+        # 최종 줄글 하루 일기
+        "full_diary": full_diary,
+        # 사용한 generate 프리셋 (프리셋마다 따로 저장됨)
+        "preset": preset,
+        # 원본 한 줄 일기 개수
+        "source_count": len(one_lines),
+        # 저장된 결과를 재사용했는지 여부
+        "cached": cached,
+    }
+
+
+async def _run_full_diary_job(db: AsyncSession, job_id: str, payload: dict) -> dict:
+    """job 워커에서 실행: KoBART 하루 줄글 일기 생성."""
+    return await _full_daily_diary(
+        db,
+        payload["user_id"],
+        payload["date"],
+        payload.get("regenerate", False),
+        _parse_preset(payload.get("preset")),
+    )
 
 
 # 5) 하루 "줄글 일기" (KoBART 학습 모델) 생성 - JSON 버전
 
 @router.post("/diaries/full")
 async def create_full_daily_diary(
-    payload: DaySummaryRequest,              # { "user_id": 1, "date": "2025-12-09" }
+    payload: FullDiaryRequest,               # { "user_id": 1, "date": "2025-12-09", "preset": "fast" }
+    job: bool = Query(False),                # true 면 job 으로 등록하고 바로 job_id 반환
+    stream: bool = Query(False),             # true 면 생성되는 텍스트를 SSE 로 바로바로 전송
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: AsyncSession = Depends(get_db_session),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
 ):
     """
     ✅ 이 엔드포인트가 **KoBART 학습 모델**을 사용하는 핵심 API.
 
     동작:
       1) 특정 user_id + date 에 해당하는 Diary.content(한 줄 일기)들을 전부 모음
-      2) daily_diary_generator.generate_daily_diary() 호출
+      2) 그날 한 줄 일기가 바뀌지 않았고 저장된 줄글 일기가 있으면 그대로 사용
+         (payload.regenerate=true 면 강제로 다시 생성)
+      3) 아니면 daily_diary_generator.generate_daily_diary() 호출
          - 내부에서:
            - 한 줄 일기들을 클린업
            - "1. ~" 리스트(bullet_lines) + combined_summary를 만들고
            - KoBART 모델로 줄글 하루 일기 생성
-      3) bullet_lines / combined_summary / generated_diary 를 함께 반환
+      4) bullet_lines / combined_summary / generated_diary 를 함께 반환
+
+    preset 으로 생성 방식을 고를 수 있다 (생략하면 서버 설정 KOBART_PRESET).
+      - "fast"    : greedy + 짧은 길이, 미리보기용
+      - "standard": 기존 샘플링 방식
+      - "quality" : beam search, 최종 일기용 (가장 느림)
+    결과는 프리셋마다 따로 저장되므로 미리보기가 최종 일기를 덮어쓰지 않는다.
+
+    ?job=true 이면 202 + job_id 를 바로 반환하고, 결과는 GET /jobs/{job_id} 로 받는다.
+    ?stream=true 이면 text/event-stream 으로 줄글 일기를 생성되는 대로(단어 단위) 보내고,
+    저장이 끝나면 마지막 `event: done` 에 일반 응답과 같은 JSON 을 담아 보낸다.
 
     요청 JSON 예시:
         {
           "user_id": 1,
-          "date": "2025-12-09"
+          "date": "2025-12-09",
+          "preset": "fast"
         }
     """
     try:
-        user_id = payload.user_id
-        date_str = payload.date
+        user_id = resolve_user_id(current_user, payload.user_id)
+        preset = _parse_preset(payload.preset)
+
+        if job and stream:
+            raise HTTPException(status_code=400, detail="job 과 stream 은 함께 쓸 수 없습니다.")
+
+        if stream:
+            return await _stream_day_generation(
+                db,
+                user_id,
+                payload.date,
+                payload.regenerate,
+                kobart_generator(preset),
+                lambda one_lines: stream_daily_diary(one_lines, preset),
+                lambda one_lines, full_diary, cached: _full_diary_result(
+                    user_id, payload.date, one_lines, full_diary, cached, preset
+                ),
+                clean=clean_generated_text,
+            )
+
+        if job:
+            # 날짜 형식 오류는 job 으로 넘기기 전에 바로 400
+            _parse_date(payload.date)
+            queued, created = await job_queue.enqueue(
+                db,
+                JOB_FULL_DIARY,
+                user_id,
+                {**payload.model_dump(), "user_id": user_id, "preset": preset},
+                idempotency_key=idempotency_key,
+            )
+            return _job_accepted(queued, created)
+
+        return await _full_daily_diary(
+            db, user_id, payload.date, payload.regenerate, preset
+        )
 
-        # 날짜 범위 계산
-        start_dt, end_dt, _ = _parse_date_range(date_str)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Daily diary generation failed: {e}")
 
-        # 해당 날짜의 Diary 조회
-        stmt = (
-            select(Diary)
+
+async def _range_version(
+    db: AsyncSession,
+    user_id: int,
+    first: date,
+    last: date,
+    generators: Optional[tuple] = None,
+) -> tuple[tuple, int, Optional[datetime]]:
+    """
+    조건부 요청 검증용: 기간 안의 Diary (개수, 마지막 id/created_at) + DailyDiary (개수, 마지막 updated_at).
+    본 조회 전에 인덱스 집계만 해서 바뀐 게 없으면 바로 304 를 돌려주기 위함
+    (Diary 는 수정되지 않고, DailyDiary 는 저장할 때마다 updated_at 이 바뀜).
+    반환: (ETag 에 넣을 값들, Diary 개수, Last-Modified)
+    """
+    count, max_id, max_created_at = (
+        await db.execute(
+            select(func.count(Diary.id), func.max(Diary.id), func.max(Diary.created_at))
             .where(Diary.user_id == user_id)
-            .where(Diary.created_at >= start_dt)
-            .where(Diary.created_at <= end_dt)
-            .order_by(Diary.created_at.asc())
+            .where(Diary.local_date >= first)
+            .where(Diary.local_date <= last)
         )
+    ).one()
+
+    daily_stmt = (
+        select(func.count(DailyDiary.id), func.max(DailyDiary.updated_at))
+        .where(DailyDiary.user_id == user_id)
+        .where(DailyDiary.diary_date >= first)
+        .where(DailyDiary.diary_date <= last)
+    )
+    if generators is not None:
+        daily_stmt = daily_stmt.where(DailyDiary.generator.in_(generators))
+    daily_count, max_updated_at = (await db.execute(daily_stmt)).one()
+
+    stamps = [t for t in (max_created_at, max_updated_at) if t is not None]
+    last_modified = max(stamps) if stamps else None
+    version = (count, max_id, max_created_at, daily_count, max_updated_at)
+    return version, count, last_modified
+
+
+# 6) 월별 캘린더 (날짜별 개수 / 대표 사진 / 하루 일기 존재 여부)
+
+def _parse_month(month: str) -> tuple[date, date]:
+    """"YYYY-MM" -> (그 달 1일, 마지막 날). 형식이 틀리면 400."""
+    try:
+        first = datetime.strptime(month, "%Y-%m").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="month 형식은 YYYY-MM 이어야 합니다.")
+    last_day = calendar.monthrange(first.year, first.month)[1]
+    return first, first.replace(day=last_day)
+
+
+@router.get("/diaries/calendar")
+async def get_diary_calendar(
+    request: Request,
+    response: Response,
+    month: str,                         # "YYYY-MM"
+    user_id: Optional[int] = None,      # Bearer 토큰을 보내면 생략 가능
+    db: AsyncSession = Depends(get_db_session),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
+):
+    """
+    한 달 동안 일기가 있는 날짜마다
+      - count: 한 줄 일기 개수
+      - thumbnail_url: 그날 첫 번째 사진의 축소본
+      - has_day_diary: 저장된 최종 하루 일기(요약/줄글)가 있는지 (fast 미리보기는 제외)
+    를 반환 (일기가 없는 날은 포함하지 않음).
+
+    날짜별로 따로 조회하지 않고, (user_id, local_date) 인덱스를 타는
+    GROUP BY 한 번 + 대표 사진 join + 하루 일기 EXISTS 를 한 쿼리로 실행.
+    If-None-Match 가 최신이면 그 쿼리 없이 집계 값만 보고 304 로 응답.
+    """
+    try:
+        user_id = resolve_user_id(current_user, user_id)
+        first, last = _parse_month(month)
+
+        # 조건부 요청 검증 (has_day_diary 에 영향을 주는 최종 하루 일기만 봄)
+        version, _, _ = await _range_version(db, user_id, first, last, FINAL_GENERATORS)
+        etag = make_etag("calendar", user_id, first, *version)
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
+
+        # 날짜별 개수 + 그날 가장 먼저 저장된 Diary id (id 는 저장 순서대로 증가)
+        per_day = (
+            select(
+                Diary.local_date.label("local_date"),
+                func.count(Diary.id).label("count"),
+                func.min(Diary.id).label("first_id"),
+            )
+            .where(Diary.user_id == user_id)
+            .where(Diary.local_date >= first)
+            .where(Diary.local_date <= last)
+            .group_by(Diary.local_date)
+            .subquery()
+        )
+
+        has_day_diary = (
+            exists()
+            .where(DailyDiary.user_id == user_id)
+            .where(DailyDiary.diary_date == per_day.c.local_date)
+            .where(DailyDiary.generator.in_(FINAL_GENERATORS))
+        )
+
+        stmt = (
+            select(
+                per_day.c.local_date,
+                per_day.c.count,
+                Diary.image_url,
+                has_day_diary.label("has_day_diary"),
+            )
+            .join(Diary, Diary.id == per_day.c.first_id)
+            .order_by(per_day.c.local_date.asc())
+        )
+
         result = await db.execute(stmt)
-        diaries: List[Diary] = result.scalars().all()
+        days = [
+            {
+                "date": row.local_date.isoformat(),
+                "count": row.count,
+                "thumbnail_url": derivative_urls(row.image_url)["thumbnail_url"] or row.image_url,
+                "has_day_diary": bool(row.has_day_diary),
+            }
+            for row in result.all()
+        ]
 
-        if not diaries:
-            raise HTTPException(status_code=404, detail="해당 날짜에 일기가 없습니다.")
+        return {
+            "user_id": user_id,
+            "month": first.strftime("%Y-%m"),
+            "days": days,
+        }
 
-        # 한 줄 일기 텍스트만 추출
-        one_lines = [d.content for d in diaries]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Diary calendar failed: {e}")
 
-        # KoBART 하루 줄글 일기 생성 (heavy 연산은 daily_diary_generator 내부에서 thread pool로 실행)
-        gen_result = await generate_daily_diary(one_lines)
+
+# 7) 하루 조회 (한 줄 일기 + 저장된 하루 일기, 생성은 하지 않음)
+
+@router.get("/diaries/day")
+async def get_day(
+    request: Request,
+    response: Response,
+    date: str,                          # "YYYY-MM-DD"
+    user_id: Optional[int] = None,      # Bearer 토큰을 보내면 생략 가능
+    db: AsyncSession = Depends(get_db_session),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
+):
+    """
+    그날의 한 줄 일기 목록과 이미 저장된 하루 일기(요약/줄글)를 반환.
+    하루 일기는 새로 만들지 않으며, 그날 한 줄 일기가 바뀐 뒤라면 stale=true.
+    (새로 만들려면 POST /diaries/summary, /diaries/full)
+
+    ETag / Last-Modified 로 조건부 요청을 지원해서
+    앱을 다시 열었을 때 바뀐 게 없으면 (일기 목록을 조회하지 않고) 304 로 응답.
+    """
+    try:
+        user_id = resolve_user_id(current_user, user_id)
+        target_date = _parse_date(date)
+
+        # 조건부 요청 검증: 집계 값만으로 ETag 를 만들고, 최신이면 본 조회 없이 304
+        version, count, last_modified = await _range_version(db, user_id, target_date, target_date)
+        if not count:
+            raise HTTPException(status_code=404, detail="해당 날짜에 일기가 없습니다.")
+        etag = make_etag("day", user_id, target_date, *version)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(etag, last_modified)
+        set_cache_headers(response, etag, last_modified)
+
+        diaries, _ = await _fetch_day_diaries(db, user_id, date)
+        stored = await list_for_day(db, user_id, target_date)
+        fingerprint = compute_fingerprint(diaries)
 
         return {
-            "status": "success",
             "user_id": user_id,
-            "date": date_str,
-            # 모델이 사용한 중간 요약 정보들
-            "bullet_lines": gen_result["bullet_lines"],           # ["1. ...", "2. ...", ...]
-            "combined_summary": gen_result["combined_summary"],   # bullet들을 합친 문자열
-            # 최종 줄글 하루 일기
-            "full_diary": gen_result["generated_diary"],
-            # 원본 한 줄 일기 개수
-            "source_count": len(one_lines),
+            "date": target_date.isoformat(),
+            "diaries": [_diary_to_dict(d) for d in diaries],
+            "day_diaries": {
+                d.generator: {
+                    "content": d.content,
+                    "stale": d.source_fingerprint != fingerprint,
+                    "updated_at": d.updated_at.isoformat() if d.updated_at else None,
+                }
+                for d in stored
+            },
         }
 
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Daily diary generation failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Diary day lookup failed: {e}")
+
+
+# job 워커가 처리할 작업 종류 등록
+job_queue.register(JOB_ONE_LINE, _run_one_line_job)
+job_queue.register(JOB_FULL_DIARY, _run_full_diary_job)
@@ -0,0 +1,99 @@
+# app/api/endpoints/job.py
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.database import get_db_session
+from app.services.job_queue import TERMINAL_STATUSES, job_queue, job_to_dict
+from app.services.security import CurrentUser, get_optional_user
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# SSE 연결 유지용 주석을 보내는 간격(초)
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+def _check_visible(job, current_user: Optional[CurrentUser]):
+    """없는 job 이거나, 토큰의 사용자와 다른 사용자의 job 이면 404."""
+    if job is None or (current_user is not None and job.user_id != current_user.id):
+        raise HTTPException(status_code=404, detail="job 을 찾을 수 없습니다.")
+    return job
+
+
+# -------------------- 1. job 상태 조회 (polling) --------------------
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
+):
+    job = _check_visible(await job_queue.get(db, job_id), current_user)
+    return job_to_dict(job)
+
+
+# -------------------- 2. job 완료까지 기다렸다가 조회 (long-poll) --------------------
+@router.get("/{job_id}/wait")
+async def wait_job(
+    job_id: str,
+    timeout: float = Query(25.0, ge=0),
+    db: AsyncSession = Depends(get_db_session),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
+):
+    """
+    job 이 끝나거나 timeout 초가 지나면 응답.
+    (timeout 은 JOB_MAX_WAIT_SECONDS 를 넘지 않음, 끝나지 않았으면 현재 상태 그대로 반환)
+    """
+    _check_visible(await job_queue.get(db, job_id), current_user)
+    job = _check_visible(
+        await job_queue.wait(job_id, min(timeout, settings.JOB_MAX_WAIT_SECONDS)),
+        current_user,
+    )
+    return job_to_dict(job)
+
+
+# -------------------- 3. job 상태 스트림 (SSE) --------------------
+@router.get("/{job_id}/events")
+async def job_events(
+    job_id: str,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
+):
+    """
+    상태가 바뀔 때마다 `event: status` 를 보내고,
+    끝나면(succeeded/failed) 최종 결과를 보낸 뒤 스트림을 닫는 server-sent events.
+    """
+    _check_visible(await job_queue.get(db, job_id), current_user)
+
+    async def _stream():
+        loop = asyncio.get_running_loop()
+        last_status = None
+        last_sent = loop.time()
+        while True:
+            # 끝나면 바로, 아니면 JOB_POLL_INTERVAL 마다 상태 확인
+            job = await job_queue.wait(job_id, settings.JOB_POLL_INTERVAL)
+            if job is None:
+                return
+
+            if job.status != last_status:
+                last_status = job.status
+                last_sent = loop.time()
+                data = json.dumps(job_to_dict(job), ensure_ascii=False)
+                yield f"event: status\ndata: {data}\n\n"
+            elif loop.time() - last_sent >= SSE_KEEPALIVE_SECONDS:
+                # 연결 유지용 주석 라인 (프록시 타임아웃 방지)
+                last_sent = loop.time()
+                yield ": keep-alive\n\n"
+
+            if job.status in TERMINAL_STATUSES:
+                return
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
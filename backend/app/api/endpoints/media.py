@@ -0,0 +1,28 @@
+# app/api/endpoints/media.py
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from app.services.http_cache import IMMUTABLE_CACHE_CONTROL, is_content_addressed
+from app.services.image_derivatives import DERIVATIVE_SIZES, ensure_derivative
+
+router = APIRouter(prefix="/media/derived", tags=["media"])
+
+
+# -------------------- 사진 축소본 (thumb / medium) --------------------
+@router.get("/{size}/{filename}")
+async def get_derivative(size: str, filename: str):
+    """
+    목록/캘린더용 축소본. 디스크에 있으면 그대로, 없으면 원본에서 만들어 저장한 뒤 반환.
+    (예: /media/derived/thumb/{sha256}.webp)
+    """
+    if size not in DERIVATIVE_SIZES:
+        raise HTTPException(status_code=404, detail="지원하지 않는 크기입니다.")
+
+    stem, _, _ = filename.partition(".")
+    path = await ensure_derivative(size, stem)
+    if path is None or path.name != filename:
+        raise HTTPException(status_code=404, detail="이미지를 찾을 수 없습니다.")
+    # 원본 해시 기준 파일명이면 내용이 바뀌지 않음 (예전 파일명 사진은 ETag 로 재검증)
+    if is_content_addressed(filename):
+        return FileResponse(path, headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL})
+    return FileResponse(path)
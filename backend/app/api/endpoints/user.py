@@ -8,7 +8,7 @@ from app.config import settings
 from app.db.database import get_db_session
 from app.db.model import User
 from app.schemas.user import UserCreate, UserResponse, UserLogin, Token
-from app.services.security import get_password_hash, verify_password, create_access_token
+from app.services.security import hash_password_async, verify_and_update_password, create_access_token
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -25,8 +25,8 @@ async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db_sess
             detail="Email already registered"
         )
     
-    # 2. 비밀번호 해시
-    hashed_password = get_password_hash(user.password)
+    # 2. 비밀번호 해시 (bcrypt 는 쓰레드 풀에서 실행)
+    hashed_password = await hash_password_async(user.password)
     
     # 3. 사용자 객체 생성 및 저장
     new_user = User(email=user.email, hashed_password=hashed_password)
@@ -40,21 +40,34 @@ async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db_sess
 # -------------------- 2. 로그인 (Login / Authentication) --------------------
 @router.post("/login", response_model=Token) 
 async def login_user(user_data: UserLogin, db: AsyncSession = Depends(get_db_session)):
-    # 1. 사용자 조회 및 비밀번호 검증 (기존 로직 유지)
+    # 1. 사용자 조회 및 비밀번호 검증 (bcrypt 는 쓰레드 풀에서 실행)
     result = await db.execute(select(User).filter(User.email == user_data.email))
     user = result.scalars().first()
-    
-    if not user or not verify_password(user_data.password, user.hashed_password):
+
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await verify_and_update_password(
+            user_data.password, user.hashed_password
+        )
+
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
+
+    user_id = user.id
+
+    # BCRYPT_ROUNDS 가 바뀐 뒤 첫 로그인이면 새 cost 로 다시 해시해서 저장
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     
     # 2. [추가된 로직] JWT Access Token 생성
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         # 토큰에 sub(Subject)라는 이름으로 user ID를 담습니다.
-        data={"sub": str(user.id)}, 
+        data={"sub": str(user_id)}, 
         expires_delta=access_token_expires
     )
     
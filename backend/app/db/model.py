@@ -1,10 +1,13 @@
 # app/db/models.py (이 파일이 Base 객체를 정의합니다)
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Date, Text, JSON, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base # 🚨 Base 정의를 여기로 옮깁니다.
 
 import datetime
+from zoneinfo import ZoneInfo
+
+from app.config import settings
 
 Base = declarative_base() # 👈 이 프로젝트의 모든 모델은 여기서 정의된 Base를 상속받습니다.
 
@@ -17,15 +20,86 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     
     diaries = relationship("Diary", back_populates="owner")
+    daily_diaries = relationship("DailyDiary", back_populates="owner")
+
+def to_local_date(created_at: datetime.datetime) -> datetime.date:
+    """UTC 기준 created_at 을 DIARY_TIMEZONE 기준 날짜로 변환 (Diary.local_date 값)."""
+    utc = created_at.replace(tzinfo=datetime.timezone.utc)
+    return utc.astimezone(ZoneInfo(settings.DIARY_TIMEZONE)).date()
+
 
 class Diary(Base):
     """AI 육아일기 내용을 저장하는 테이블"""
     __tablename__ = "diaries"
+    __table_args__ = (
+        # 유저별 최신순 목록 / 날짜별 조회용 복합 인덱스
+        Index("ix_diaries_user_id_created_at", "user_id", "created_at"),
+        Index("ix_diaries_user_id_local_date", "user_id", "local_date"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     content = Column(String, nullable=False)
     image_url = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    # created_at 을 DIARY_TIMEZONE 으로 바꾼 날짜 (캘린더/하루 조회는 이 컬럼으로 equality 조회)
+    local_date = Column(Date, nullable=False)
     
-    owner = relationship("User", back_populates="diaries")
\ No newline at end of file
+    owner = relationship("User", back_populates="diaries")
+
+
+class DailyDiary(Base):
+    """하루 요약/줄글 일기 생성 결과 (같은 날 한 줄 일기가 그대로면 재사용)"""
+    __tablename__ = "daily_diaries"
+    __table_args__ = (
+        UniqueConstraint("user_id", "diary_date", "generator", name="uq_daily_diary_user_date_generator"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    diary_date = Column(Date, nullable=False)
+    # "kobart" (/diaries/full) 또는 "gpt_summary" (/diaries/summary, /diaries/summary-json)
+    generator = Column(String(32), nullable=False)
+
+    # 생성에 사용된 Diary 행들(id + content)의 sha256. 달라지면 다시 생성
+    source_fingerprint = Column(String(64), nullable=False)
+    source_count = Column(Integer, nullable=False)
+
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    owner = relationship("User", back_populates="daily_diaries")
+
+
+class OneLineDiaryCache(Base):
+    """이미지 해시 + 프롬프트/모델 파라미터 기준 한 줄 일기 결과 캐시"""
+    __tablename__ = "one_line_diary_cache"
+    # sha256(정규화된 이미지 바이트 + 프롬프트 + 모델 파라미터)
+    cache_key = Column(String(64), primary_key=True)
+
+    content = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+
+class GenerationJob(Base):
+    """AI 생성 작업 큐 (job 모드로 요청된 한 줄 일기 / 하루 줄글 일기 생성)"""
+    __tablename__ = "generation_jobs"
+    __table_args__ = (
+        UniqueConstraint("user_id", "idempotency_key", name="uq_generation_job_idempotency"),
+    )
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # "one_line" (POST /diaries/) 또는 "full_diary" (POST /diaries/full)
+    kind = Column(String(32), nullable=False)
+    # queued -> running -> succeeded / failed
+    status = Column(String(16), nullable=False, default="queued", index=True)
+    # 클라이언트가 보낸 Idempotency-Key (같은 키로 재시도하면 같은 job 반환)
+    idempotency_key = Column(String(128), nullable=True)
+
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
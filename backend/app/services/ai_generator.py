@@ -1,11 +1,20 @@
 # app/services/ai_generator.py
 
 import os
+import asyncio
 import base64
-from openai import OpenAI
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from openai import AsyncOpenAI, APITimeoutError, DefaultAsyncHttpxClient
+import httpx
 from fastapi import HTTPException
 from dotenv import load_dotenv
 
+from app.config import settings
+from app.services.metrics import OPENAI_ERRORS, OPENAI_LATENCY
+
 # .env 읽어오기 (OPENAI_API_KEY=... )
 load_dotenv()
 
@@ -13,19 +22,108 @@ MODEL_NAME = "gpt-4.1-mini"
 MAX_TOKENS = 64
 TEMPERATURE = 0.7
 
+# 코랩의 system_prompt 그대로 (한 줄 일기 캐시 키에도 포함됨)
+ONE_LINE_SYSTEM_PROMPT = (
+    "너는 부모를 위한 육아 일기 도우미야. "
+    "아기 또는 아이의 사진을 보고 오늘 있었던 순간을 떠올리듯이, "
+    "감성적인 한국어 한 줄 일기를 만들어주는 역할을 한다."
+)
+
 
-def get_client() -> OpenAI:
+# 프로세스 전체에서 공유하는 비동기 클라이언트 / 동시 요청 제한 (최초 1회만 생성)
+_client: Optional[AsyncOpenAI] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_client() -> AsyncOpenAI:
     """
     코랩에서 했던 `client = OpenAI()`를 서버 스타일로 감싼 함수.
-    환경변수에 키가 없으면 500 에러.
+
+    - 매 호출마다 새 클라이언트를 만들지 않고, 커넥션 풀을 가진
+      AsyncOpenAI 하나를 프로세스 전체에서 재사용.
+    - 환경변수에 키가 없으면 500 에러.
     """
+    global _client
+
+    if _client is not None:
+        return _client
+
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise HTTPException(
             status_code=500,
             detail="OPENAI_API_KEY 환경변수가 설정되어 있지 않습니다.",
         )
-    return OpenAI(api_key=api_key)
+
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+    _client = AsyncOpenAI(
+        api_key=api_key,
+        http_client=http_client,
+        timeout=httpx.Timeout(
+            settings.OPENAI_TIMEOUT,
+            connect=settings.OPENAI_CONNECT_TIMEOUT,
+        ),
+        max_retries=settings.OPENAI_MAX_RETRIES,
+    )
+    return _client
+
+
+async def close_client() -> None:
+    """앱 종료 시 공유 클라이언트의 커넥션 풀을 정리."""
+    global _client
+
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """OpenAI 동시 요청 수를 OPENAI_MAX_CONCURRENCY 로 제한하는 세마포어."""
+    global _semaphore
+
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+    return _semaphore
+
+
+@asynccontextmanager
+async def _openai_call(operation: str) -> AsyncIterator[None]:
+    """
+    OpenAI 호출 1건을 감싸는 공통 구간.
+    동시 요청 수 제한을 걸고, 시간/에러를 메트릭에 남기고, 타임아웃은 504로 바꿔서 돌려줌.
+    (스트리밍 호출은 응답을 끝까지 읽을 때까지가 한 구간)
+    """
+    async with _get_semaphore():
+        start = time.perf_counter()
+        try:
+            yield
+        except APITimeoutError:
+            OPENAI_ERRORS.inc(operation=operation, error="timeout")
+            raise HTTPException(
+                status_code=504,
+                detail="OpenAI 응답 시간이 초과되었습니다.",
+            )
+        except Exception as e:
+            OPENAI_ERRORS.inc(operation=operation, error=type(e).__name__)
+            raise
+        finally:
+            OPENAI_LATENCY.observe(time.perf_counter() - start, operation=operation)
+
+
+async def _create_chat_completion(operation: str, **kwargs):
+    """
+    chat.completions.create 를 비동기로 호출하는 공통 함수.
+    operation: 메트릭 label ("one_line", "daily_summary")
+    """
+    client = get_client()
+
+    async with _openai_call(operation):
+        return await client.chat.completions.create(**kwargs)
 
 
 def encode_file_to_base64(file_bytes: bytes) -> str:
@@ -37,27 +135,24 @@ def encode_file_to_base64(file_bytes: bytes) -> str:
     return base64.b64encode(file_bytes).decode("utf-8")
 
 
-async def generate_one_line_diary(image_data: bytes, user_prompt: str) -> str:
+async def generate_one_line_diary(
+    image_data: bytes,
+    user_prompt: str,
+    mime_type: str = "image/jpeg",
+) -> str:
     """
     .ipynb의 generate_one_line_diary_from_image()를
     '이미지 경로' 대신 '이미지 바이트'를 받도록 바꾼 버전.
     user_prompt에는 코랩에서 쓰던 그 긴 프롬프트 문자열이 들어옴.
+    mime_type은 data URL에 들어갈 이미지 타입 (전처리 결과에 맞춰 전달).
     """
     image_b64 = encode_file_to_base64(image_data)
 
-    # 코랩의 system_prompt 그대로
-    system_prompt = (
-        "너는 부모를 위한 육아 일기 도우미야. "
-        "아기 또는 아이의 사진을 보고 오늘 있었던 순간을 떠올리듯이, "
-        "감성적인 한국어 한 줄 일기를 만들어주는 역할을 한다."
-    )
-
-    client = get_client()
-
-    response = client.chat.completions.create(
+    response = await _create_chat_completion(
+        "one_line",
         model=MODEL_NAME,
         messages=[
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": ONE_LINE_SYSTEM_PROMPT},
             {
                 "role": "user",
                 "content": [
@@ -68,7 +163,7 @@ async def generate_one_line_diary(image_data: bytes, user_prompt: str) -> str:
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/jpeg;base64,{image_b64}"
+                            "url": f"data:{mime_type};base64,{image_b64}"
                         },
                     },
                 ],
@@ -82,7 +177,7 @@ async def generate_one_line_diary(image_data: bytes, user_prompt: str) -> str:
     return one_line
 
 
-async def generate_daily_summary(one_line_diaries: list[str], date_str: str) -> str:
+def _daily_summary_messages(one_line_diaries: list[str], date_str: str) -> list[dict]:
     joined = "\n".join(f"- {line}" for line in one_line_diaries)
 
     system_prompt = (
@@ -99,17 +194,47 @@ async def generate_daily_summary(one_line_diaries: list[str], date_str: str) ->
         f"{joined}"
     )
 
-    client = get_client()
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
 
-    response = client.chat.completions.create(
+async def generate_daily_summary(one_line_diaries: list[str], date_str: str) -> str:
+    response = await _create_chat_completion(
+        "daily_summary",
         model=MODEL_NAME,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
+        messages=_daily_summary_messages(one_line_diaries, date_str),
         max_tokens=512,
         temperature=0.7,
     )
 
     summary = response.choices[0].message.content.strip()
     return summary
+
+
+async def stream_daily_summary(one_line_diaries: list[str], date_str: str) -> AsyncIterator[str]:
+    """
+    generate_daily_summary 의 스트리밍 버전.
+    stream=True 로 호출해서 도착하는 텍스트 조각을 바로바로 돌려줌 (SSE 응답용).
+    """
+    client = get_client()
+
+    async with _openai_call("daily_summary_stream"):
+        stream = await client.chat.completions.create(
+            model=MODEL_NAME,
+            messages=_daily_summary_messages(one_line_diaries, date_str),
+            max_tokens=512,
+            temperature=0.7,
+            stream=True,
+        )
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    yield text
+        finally:
+            # 클라이언트가 중간에 끊어도 커넥션을 풀에 돌려줌
+            await stream.close()
@@ -0,0 +1,204 @@
+# app/services/batch_engine.py
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from anyio import to_thread
+
+
+@dataclass
+class _Request:
+    """큐에 들어가는 요청 1건."""
+    item: Any
+    key: Hashable
+    future: asyncio.Future
+
+
+class BatchInferenceEngine:
+    """
+    동시에 들어온 추론 요청을 잠깐(max_wait_ms) 모았다가
+    한 번의 배치 호출(batch_fn)로 처리하는 마이크로 배칭 엔진.
+
+    - batch_fn(items, key) -> results 는 블로킹 함수이며 쓰레드 풀에서 실행됨.
+      results 는 items 와 같은 순서/길이여야 함.
+    - key 가 다른 요청(예: 생성 옵션이 다른 요청)은 같은 배치에 섞지 않음.
+    - 배치가 실행되는 동안 들어온 요청은 큐에 쌓였다가 다음 배치로 묶임.
+    - run_sync 로 batch_fn 을 실행할 쓰레드 풀을 바꿀 수 있음 (기본: AnyIO 쓰레드 풀).
+    - max_concurrent_batches 개까지 배치를 동시에 실행 (기본 1 = 한 번에 한 배치).
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any], Hashable], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        name: str = "engine",
+        run_sync: Optional[Callable[..., Awaitable[Any]]] = None,
+        max_concurrent_batches: int = 1,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self.run_sync = run_sync or to_thread.run_sync
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+        # 메트릭
+        self._processing = 0
+        self._batches_total = 0
+        self._requests_total = 0
+        self._errors_total = 0
+        self._last_batch_size = 0
+        self._max_queue_depth = 0
+
+    # ---------- 수명 주기 ----------
+
+    def _ensure_started(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """워커 종료 (앱 shutdown 시 호출). 남아 있는 요청은 취소됨."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        # 실행 중인 배치도 취소 (대기 중인 요청은 _execute 에서 취소 처리)
+        for task in list(self._in_flight):
+            task.cancel()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        self._in_flight.clear()
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                req = self._queue.get_nowait()
+                if not req.future.done():
+                    req.future.cancel()
+            self._queue = None
+
+    # ---------- 요청 ----------
+
+    async def submit(self, item: Any, key: Hashable = None) -> Any:
+        """요청 1건을 큐에 넣고, 배치 처리 결과 중 자기 몫을 돌려받음."""
+        self._ensure_started()
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Request(item=item, key=key, future=future))
+        self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return await future
+
+    # ---------- 워커 ----------
+
+    async def _collect(self) -> List[_Request]:
+        """첫 요청을 기다린 뒤, max_wait 동안 최대 max_batch_size 개까지 모음."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # 이미 쌓여 있는 요청은 기다리지 않고 바로 가져옴
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _execute(self, key: Hashable, group: List[_Request]) -> None:
+        # 대기 중에 취소된 요청은 빼고 실행
+        group = [r for r in group if not r.future.done()]
+        if not group:
+            return
+
+        self._processing += len(group)
+        try:
+            results = await self.run_sync(
+                self.batch_fn, [r.item for r in group], key
+            )
+        except asyncio.CancelledError:
+            for r in group:
+                r.future.cancel()
+            raise
+        except Exception as e:
+            self._errors_total += 1
+            for r in group:
+                if not r.future.done():
+                    r.future.set_exception(e)
+        else:
+            for r, result in zip(group, results):
+                if not r.future.done():
+                    r.future.set_result(result)
+        finally:
+            self._processing -= len(group)
+            self._batches_total += 1
+            self._requests_total += len(group)
+            self._last_batch_size = len(group)
+
+    async def _execute_batch(self, batch: List[_Request]) -> None:
+        groups: Dict[Hashable, List[_Request]] = defaultdict(list)
+        for req in batch:
+            groups[req.key].append(req)
+
+        for key, group in groups.items():
+            await self._execute(key, group)
+
+    async def _run(self) -> None:
+        # 빈 실행 슬롯이 생긴 뒤에 요청을 모음
+        # (슬롯이 다 찬 동안 들어온 요청은 큐에 쌓였다가 더 큰 배치로 묶임)
+        slots = asyncio.Semaphore(self.max_concurrent_batches)
+        loop = asyncio.get_running_loop()
+
+        def _done(task: asyncio.Task) -> None:
+            self._in_flight.discard(task)
+            slots.release()
+
+        while True:
+            await slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                slots.release()
+                raise
+
+            task = loop.create_task(self._execute_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(_done)
+
+    # ---------- 메트릭 ----------
+
+    def stats(self) -> Dict[str, Any]:
+        """큐 깊이 / 배치 크기 등 현재 상태."""
+        batches = self._batches_total
+        return {
+            "name": self.name,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self._max_queue_depth,
+            "processing": self._processing,
+            "batches_in_flight": len(self._in_flight),
+            "max_concurrent_batches": self.max_concurrent_batches,
+            "batches_total": batches,
+            "requests_total": self._requests_total,
+            "errors_total": self._errors_total,
+            "last_batch_size": self._last_batch_size,
+            "avg_batch_size": (self._requests_total / batches) if batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
@@ -1,14 +1,39 @@
 # app/services/daily_diary_generator.py
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import os
+import threading
+import time
+from contextlib import aclosing
 from pathlib import Path
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Optional
 
 import torch
 import regex as re
 import emoji
-from transformers import BartForConditionalGeneration, PreTrainedTokenizerFast
+from transformers import (
+    BartForConditionalGeneration,
+    PreTrainedTokenizerFast,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextStreamer,
+)
+
+from app.config import settings
+from app.services import inference_client
+from app.services.batch_engine import BatchInferenceEngine
+from app.services.inference_scheduler import InferenceScheduler
+from app.services.one_line_cache import LRUCache
+from app.services.metrics import (
+    CallbackGauge,
+    KOBART_MEMO_HITS,
+    KOBART_TOKENS,
+    KOBART_TOKENS_PER_SECOND,
+    STAGE_LATENCY,
+    stage_timer,
+)
 
 # 1) 모델 / 토크나이저 경로 설정
 
@@ -20,24 +45,78 @@ BASE_DIR = Path(__file__).resolve().parents[2]
 #   Aiary/
 #     └─ models/
 #          └─ day_diary_from_summary_v2/
-MODEL_DIR = BASE_DIR / "models" / "day_diary_from_summary_v2"
+# (KOBART_MODEL_DIR 로 변경 가능)
+MODEL_DIR = Path(settings.KOBART_MODEL_DIR or BASE_DIR / "models" / "day_diary_from_summary_v2")
+
+# ONNX Runtime 백엔드용으로 변환된 모델 디렉터리
+# (scripts/convert_day_diary_model.py 로 생성, KOBART_ONNX_DIR 로 변경 가능)
+ONNX_MODEL_DIR = BASE_DIR / "models" / "day_diary_from_summary_v2_onnx"
+
+# 선택 가능한 추론 백엔드 (settings.KOBART_BACKEND)
+#   - "pytorch": 기존 fp32 PyTorch 모델
+#   - "int8"   : nn.Linear 를 dynamic int8 양자화한 PyTorch 모델 (CPU 전용)
+#   - "onnx"   : ONNX Runtime encoder/decoder (+KV-cache) 모델 (CPU 전용)
+BACKENDS = ("pytorch", "int8", "onnx")
 
 # 인코딩/디코딩 길이 제한
 MAX_INPUT_LEN = 256
 MAX_TARGET_LEN = 220
 
+# generate 프리셋 (요청의 preset 또는 settings.KOBART_PRESET 으로 선택)
+#   - "fast"    : greedy + 짧은 상한 -> 미리보기용, 가장 빠름
+#   - "standard": 기존 설정 (top-p 샘플링)
+#   - "quality" : beam search -> 최종 일기용, 가장 느림
+GENERATION_PRESETS: Dict[str, Dict[str, object]] = {
+    "fast": {
+        "max_new_tokens": 96,
+        "min_length": 20,
+        "no_repeat_ngram_size": 3,
+        "repetition_penalty": 2.0,
+        "do_sample": False,
+        "num_beams": 1,
+    },
+    "standard": {
+        "max_new_tokens": MAX_TARGET_LEN,
+        "min_length": 40,
+        "no_repeat_ngram_size": 3,
+        "repetition_penalty": 2.0,
+        "do_sample": True,
+        "temperature": 0.6,
+        "top_p": 0.9,
+    },
+    "quality": {
+        "max_new_tokens": MAX_TARGET_LEN,
+        "min_length": 40,
+        "no_repeat_ngram_size": 3,
+        "repetition_penalty": 2.0,
+        "do_sample": False,
+        "num_beams": 4,
+        "length_penalty": 1.0,
+        "early_stopping": True,
+    },
+}
+PRESETS = tuple(GENERATION_PRESETS)
+
 # lazy-loading 을 위한 전역 변수 (최초 1회만 로드)
 _tokenizer = None
 _model = None
 _device = None
 
+# 동시에 들어온 첫 요청들이 모델을 두 번 로드하지 않도록 보호
+_load_lock = threading.Lock()
+
+# 워밍업(eager load) 상태: None=시작 전, "loading", "ready", "failed"
+_warmup_state: str | None = None
+_warmup_error: str | None = None
+
 
 def _load_model_if_needed():
     """
     KoBART 토크나이저와 모델을 **최초 1번만** 로드하는 함수.
 
-    - FastAPI 서버 띄운 후 첫 호출에서만 모델을 실제로 로드.
+    - FastAPI 서버 띄운 후 첫 호출(또는 startup 워밍업)에서만 모델을 실제로 로드.
     - 이후 호출에서는 이미 로드된 전역 객체를 재사용해서 속도/메모리 절약.
+    - lock 으로 감싸서 여러 쓰레드가 동시에 불러도 한 번만 로드.
     """
     global _tokenizer, _model, _device
 
@@ -45,26 +124,125 @@ def _load_model_if_needed():
         # 이미 로딩된 상태라면 그대로 사용
         return
 
-    if not MODEL_DIR.exists():
-        raise FileNotFoundError(f"하루일기 모델 디렉토리를 찾을 수 없습니다: {MODEL_DIR}")
+    with _load_lock:
+        # lock 을 기다리는 동안 다른 쓰레드가 로드를 끝냈을 수 있음
+        if _model is not None and _tokenizer is not None:
+            return
+
+        if not MODEL_DIR.exists():
+            raise FileNotFoundError(f"하루일기 모델 디렉토리를 찾을 수 없습니다: {MODEL_DIR}")
+
+        print("[INFO] 하루일기 모델 / 토크나이저 로드 중...", flush=True)
+
+        # HuggingFace Transformers 형식으로 저장된 디렉터리에서 바로 로드
+        tokenizer = PreTrainedTokenizerFast.from_pretrained(str(MODEL_DIR))
+
+        # pad_token 이 없으면 eos_token을 pad 로 사용
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+
+        model, device = load_backend_model(settings.KOBART_BACKEND)
+
+        # 다 준비된 뒤에 전역 변수에 넣어서, 반쯤 로드된 상태가 보이지 않게 함
+        _tokenizer, _device, _model = tokenizer, device, model
+
+        print(f"[INFO] backend = {settings.KOBART_BACKEND}, device = {_device}", flush=True)
+        print("[INFO] 하루일기 모델 로드 완료", flush=True)
+
+
+def load_backend_model(backend: str, model_dir: Path | None = None, onnx_dir: Path | None = None):
+    """
+    backend 이름에 맞는 generate 가능한 모델과 device 를 만들어 돌려줌.
+    (변환/비교 스크립트에서도 같은 방식으로 로드하기 위해 분리)
+    """
+    model_dir = model_dir or MODEL_DIR
+
+    if backend == "pytorch":
+        model = BartForConditionalGeneration.from_pretrained(str(model_dir))
+        # GPU가 있으면 cuda, 없으면 cpu 사용
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        model.to(device)
+        model.eval()
+        return model, device
+
+    if backend == "int8":
+        model = BartForConditionalGeneration.from_pretrained(str(model_dir))
+        model.eval()
+        # Linear 가중치만 int8 로 바꾸고, activation 은 실행 중에 동적으로 양자화
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        return model, torch.device("cpu")
+
+    if backend == "onnx":
+        # optimum[onnxruntime] 는 onnx 백엔드를 쓸 때만 필요
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError:
+            raise RuntimeError(
+                "onnx 백엔드를 사용하려면 `pip install optimum[onnxruntime]` 가 필요합니다."
+            )
+
+        onnx_dir = onnx_dir or Path(settings.KOBART_ONNX_DIR or ONNX_MODEL_DIR)
+        if not onnx_dir.exists():
+            raise FileNotFoundError(
+                f"ONNX 모델 디렉토리를 찾을 수 없습니다: {onnx_dir} "
+                "(scripts/convert_day_diary_model.py 로 먼저 변환하세요)"
+            )
+        model = ORTModelForSeq2SeqLM.from_pretrained(
+            str(onnx_dir),
+            use_cache=True,
+            provider="CPUExecutionProvider",
+        )
+        return model, torch.device("cpu")
+
+    raise ValueError(f"지원하지 않는 KOBART_BACKEND 입니다: {backend} (가능: {BACKENDS})")
 
-    print("[INFO] 하루일기 모델 / 토크나이저 로드 중...", flush=True)
 
-    # HuggingFace Transformers 형식으로 저장된 디렉터리에서 바로 로드
-    _tokenizer = PreTrainedTokenizerFast.from_pretrained(str(MODEL_DIR))
-    _model = BartForConditionalGeneration.from_pretrained(str(MODEL_DIR))
+def warm_up() -> None:
+    """
+    startup 에서 호출하는 워밍업 함수 (KOBART_EAGER_LOAD=True 일 때).
 
-    # pad_token 이 없으면 eos_token을 pad 로 사용
-    if _tokenizer.pad_token is None:
-        _tokenizer.pad_token = _tokenizer.eos_token
+    모델을 미리 로드하고 짧은 generate 를 한 번 돌려서
+    첫 forward 오버헤드를 첫 사용자 대신 배포 시점에 치름.
+    """
+    global _warmup_state, _warmup_error
 
-    # GPU가 있으면 cuda, 없으면 cpu 사용
-    _device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    _model.to(_device)
-    _model.eval()
+    _warmup_state = "loading"
+    try:
+        _load_model_if_needed()
+        generate_diaries_from_summaries(
+            ["1. 아이가 활짝 웃었다."], max_len=8, preset=resolve_preset(None)
+        )
+    except Exception as e:
+        _warmup_state = "failed"
+        _warmup_error = str(e)
+        print(f"[ERROR] 하루일기 모델 워밍업 실패: {e}", flush=True)
+        raise
 
-    print(f"[INFO] device = {_device}", flush=True)
-    print("[INFO] 하루일기 모델 로드 완료", flush=True)
+    _warmup_state = "ready"
+    _warmup_error = None
+    print("[INFO] 하루일기 모델 워밍업 완료", flush=True)
+
+
+def readiness() -> Dict[str, object]:
+    """
+    readiness probe 용 상태.
+    - eager load 를 켰다면 워밍업이 끝나야 ready.
+    - 끄고 lazy 로 쓰는 경우엔 항상 ready (첫 요청에서 로드).
+    """
+    if settings.KOBART_EAGER_LOAD:
+        ready = _warmup_state == "ready"
+    else:
+        ready = True
+
+    return {
+        "ready": ready,
+        "eager_load": settings.KOBART_EAGER_LOAD,
+        "model_loaded": _model is not None,
+        "warmup_state": _warmup_state,
+        "error": _warmup_error,
+    }
 
 
 # 2) 텍스트 정제 함수들
@@ -112,80 +290,454 @@ def build_summary_bullets(one_line_list: List[str]) -> Dict[str, object]:
 
 # 3) 요약 -> 하루일기 생성 (실제 KoBART 호출)
 
-def generate_diary_from_summary(summary_text: str, max_len: int = MAX_TARGET_LEN) -> str:
+def generate_diary_from_summary(
+    summary_text: str, max_len: int | None = None, preset: str = "standard"
+) -> str:
     """
     summary_text: '1. ~\\n2. ~\\n3. ~' 형태의 요약 문자열
     return: KoBART가 생성한 하루 일기 텍스트
     """
-    _load_model_if_needed()
-
-    # 학습 때 사용했던 포맷을 맞춰줌
-    input_text = f"[SUMMARY]\n{summary_text}\n[DIARY]"
-
-    enc = _tokenizer(
-        input_text,
-        max_length=MAX_INPUT_LEN,
-        padding="max_length",
-        truncation=True,
-        return_tensors="pt",
-    )
+    return generate_diaries_from_summaries([summary_text], max_len=max_len, preset=preset)[0]
+
+
+def _length_bucket(length: int) -> int:
+    """입력 토큰 길이가 들어갈 버킷 상한 (KOBART_LENGTH_BUCKETS 기준)."""
+    for bound in settings.KOBART_LENGTH_BUCKETS:
+        if length <= bound:
+            return bound
+    return MAX_INPUT_LEN
+
+
+def _generate_padded(
+    features: List[Dict[str, List[int]]], padding: str, max_len: int | None, preset: str
+) -> List[str]:
+    """토큰화된 입력들을 padding 방식에 맞춰 하나의 배치로 만들고 generate."""
+    with stage_timer("kobart_pad"):
+        enc = _tokenizer.pad(
+            features,
+            padding=padding,
+            max_length=MAX_INPUT_LEN if padding == "max_length" else None,
+            pad_to_multiple_of=settings.KOBART_PAD_TO_MULTIPLE_OF if padding == "longest" else None,
+            return_tensors="pt",
+        )
 
-    input_ids = enc["input_ids"].to(_device)
-    attention_mask = enc["attention_mask"].to(_device)
+        input_ids = enc["input_ids"].to(_device)
+        attention_mask = enc["attention_mask"].to(_device)
 
+    start = time.perf_counter()
     with torch.no_grad():
         outputs = _model.generate(
             input_ids=input_ids,
             attention_mask=attention_mask,
-            max_new_tokens=max_len,
-            min_length=40,
-            no_repeat_ngram_size=3,
-            repetition_penalty=2.0,
-            do_sample=True,
-            temperature=0.6,
-            top_p=0.9,
-            early_stopping=True,
-            eos_token_id=_tokenizer.eos_token_id,
+            **_generation_kwargs(preset, max_len),
         )
+    _record_generate(outputs, time.perf_counter() - start)
 
-    pred = _tokenizer.decode(outputs[0], skip_special_tokens=True)
-    pred = pred.replace("[DIARY]", "").strip()
-    return pred
+    with stage_timer("kobart_decode"):
+        preds = _tokenizer.batch_decode(outputs, skip_special_tokens=True)
+    return [clean_generated_text(pred) for pred in preds]
 
 
-# 4) FastAPI에서 쓸 비동기 래퍼
+def resolve_preset(preset: Optional[str]) -> str:
+    """요청에 온 프리셋 이름 (없으면 settings.KOBART_PRESET). 모르는 이름이면 ValueError."""
+    name = preset or settings.KOBART_PRESET
+    if name not in GENERATION_PRESETS:
+        raise ValueError(f"지원하지 않는 preset 입니다: {name} (가능: {', '.join(PRESETS)})")
+    return name
 
-async def generate_daily_diary(one_line_list: List[str]) -> Dict[str, object]:
+
+def preset_options(preset: str) -> Dict[str, object]:
+    """
+    프리셋의 generate 옵션.
+    KOBART_DETERMINISTIC=True 면 샘플링 프리셋도 greedy 로 바꿔서 같은 입력이면 항상 같은 결과가 나오게 함.
+    """
+    options = dict(GENERATION_PRESETS[preset])
+    if settings.KOBART_DETERMINISTIC and options.get("do_sample"):
+        options["do_sample"] = False
+        options.pop("temperature", None)
+        options.pop("top_p", None)
+    return options
+
+
+def is_deterministic(preset: str) -> bool:
+    """샘플링을 하지 않는(같은 입력 -> 같은 결과) 프리셋인지."""
+    return not preset_options(preset).get("do_sample", False)
+
+
+def _generation_kwargs(preset: str, max_len: int | None = None) -> Dict[str, object]:
+    """generate 옵션 (배치 / 스트리밍 공통). max_len 을 주면 프리셋의 생성 길이 상한 대신 사용."""
+    options = preset_options(preset)
+    if max_len is not None:
+        options["max_new_tokens"] = max_len
+    return {
+        **options,
+        "eos_token_id": _tokenizer.eos_token_id,
+        "pad_token_id": _tokenizer.pad_token_id,
+    }
+
+
+def clean_generated_text(text: str) -> str:
+    """디코딩된 결과에서 프롬프트 태그를 떼어낸 최종 하루 일기 텍스트."""
+    return text.replace("[DIARY]", "").strip()
+
+
+def _record_generate(outputs, elapsed: float) -> None:
+    """generate 시간 + 생성 토큰 수(padding, decoder 시작 토큰 제외) 기록."""
+    if not settings.METRICS_ENABLED:
+        return
+    STAGE_LATENCY.observe(elapsed, stage="kobart_generate")
+    generated = int((outputs != _tokenizer.pad_token_id).sum()) - outputs.shape[0]
+    KOBART_TOKENS.inc(max(0, generated))
+    if elapsed > 0:
+        KOBART_TOKENS_PER_SECOND.observe(generated / elapsed)
+
+
+def generate_diaries_from_summaries(
+    summary_texts: List[str],
+    max_len: int | None = None,
+    padding: str | None = None,
+    preset: str = "standard",
+) -> List[str]:
+    """
+    여러 요약 문자열을 padded 배치로 generate 하는 함수.
+    (BatchInferenceEngine 이 동시에 들어온 요청들을 모아서 호출)
+
+    summary_texts: generate_diary_from_summary 와 같은 형식의 요약 문자열 리스트
+    padding:
+      - "longest"    : 입력들을 길이 버킷별로 나눈 뒤, 버킷 안에서 가장 긴 입력에 맞춰 padding
+                       (인코더 연산량이 실제 입력 길이에 비례)
+      - "max_length" : 기존 방식, 항상 MAX_INPUT_LEN 까지 padding
+      - None         : settings.KOBART_PADDING 사용
+    max_len: 생성 토큰 수 상한 (None 이면 프리셋의 상한)
+    preset : GENERATION_PRESETS 의 이름
+    return: 입력과 같은 순서의 하루 일기 텍스트 리스트
+    """
+    _load_model_if_needed()
+
+    padding = padding or settings.KOBART_PADDING
+    if padding not in ("longest", "max_length"):
+        raise ValueError(f"지원하지 않는 padding 방식입니다: {padding}")
+
+    # 학습 때 사용했던 포맷을 맞춰줌
+    input_texts = [f"[SUMMARY]\n{text}\n[DIARY]" for text in summary_texts]
+
+    # padding 없이 한 번만 토큰화한 뒤, 배치를 만들 때 padding
+    with stage_timer("kobart_tokenize"):
+        encoded = _tokenizer(input_texts, max_length=MAX_INPUT_LEN, truncation=True)
+    features = [
+        {"input_ids": ids, "attention_mask": mask}
+        for ids, mask in zip(encoded["input_ids"], encoded["attention_mask"])
+    ]
+
+    if padding == "max_length":
+        return _generate_padded(features, padding, max_len, preset)
+
+    # 길이가 비슷한 입력끼리 묶어서 짧은 입력이 긴 입력만큼 padding 되지 않도록 함
+    buckets: Dict[int, List[int]] = {}
+    for i, feature in enumerate(features):
+        buckets.setdefault(_length_bucket(len(feature["input_ids"])), []).append(i)
+
+    results: List[str] = [""] * len(features)
+    for indices in buckets.values():
+        preds = _generate_padded([features[i] for i in indices], padding, max_len, preset)
+        for i, pred in zip(indices, preds):
+            results[i] = pred
+    return results
+
+
+# 4) 마이크로 배칭 엔진 (동시 요청을 모아서 한 번에 generate)
+
+# generate 전용 쓰레드 풀: 배치 / 스트리밍 / 워밍업 generate 가 모두 여기서 실행됨
+scheduler = InferenceScheduler(
+    slots=settings.KOBART_GENERATE_SLOTS,
+    intra_op_threads=settings.KOBART_INTRA_OP_THREADS,
+    inter_op_threads=settings.KOBART_INTER_OP_THREADS,
+    name="kobart",
+)
+
+
+def _run_batch(summary_texts: List[str], key: tuple) -> List[str]:
+    # key = (preset, max_len): 생성 옵션이 다른 요청은 같은 배치에 섞이지 않음
+    preset, max_len = key
+    return generate_diaries_from_summaries(summary_texts, max_len=max_len, preset=preset)
+
+
+engine = BatchInferenceEngine(
+    _run_batch,
+    max_batch_size=settings.KOBART_MAX_BATCH_SIZE,
+    max_wait_ms=settings.KOBART_MAX_WAIT_MS,
+    name="kobart",
+    run_sync=scheduler.run,
+    max_concurrent_batches=scheduler.slots,
+)
+
+
+def inference_stats() -> Dict[str, object]:
+    """배칭 엔진 상태 + generate 쓰레드 풀 상태 (/inference/stats 응답)."""
+    return {**engine.stats(), "scheduler": scheduler.stats()}
+
+
+# 결정적 프리셋의 결과 메모 (같은 요약 + 같은 프리셋이면 generate 없이 바로 반환)
+_memo = LRUCache(settings.KOBART_MEMO_SIZE)
+
+
+def _memo_key(summary_text: str, preset: str, max_len: int | None) -> Optional[str]:
+    """메모 키 (샘플링 프리셋이면 매번 결과가 달라서 None)."""
+    if not is_deterministic(preset):
+        return None
+    h = hashlib.sha256()
+    for part in (preset, str(max_len), summary_text):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def _memo_get(key: Optional[str], preset: str) -> Optional[str]:
+    text = _memo.get(key) if key is not None else None
+    if text is not None and settings.METRICS_ENABLED:
+        KOBART_MEMO_HITS.inc(preset=preset)
+    return text
+
+
+async def generate_summary_local(
+    summary_text: str, preset: str, max_len: int | None = None
+) -> str:
+    """이 프로세스의 배칭 엔진으로 요약 문자열 1건 generate (결정적 프리셋이면 메모 사용)."""
+    key = _memo_key(summary_text, preset, max_len)
+    text = _memo_get(key, preset)
+    if text is None:
+        text = await engine.submit(summary_text, key=(preset, max_len))
+        if key is not None:
+            _memo.set(key, text)
+    return text
+
+
+async def warm_up_in_background() -> None:
+    """
+    startup 에서 create_task 로 띄우는 워밍업 (API 서버 / 추론 서버 공통).
+    generate 쓰레드에서 warm_up() 실행. 실패 내용은 readiness() 에 기록되어 /health/ready 로 확인 가능.
+    """
+    try:
+        await scheduler.run(warm_up)
+    except Exception:
+        pass
+
+
+async def shutdown() -> None:
+    """배칭 엔진 워커와 generate 쓰레드 풀 정리 (앱 shutdown 시 호출)."""
+    await engine.stop()
+    scheduler.shutdown()
+
+
+def register_engine_metrics() -> None:
+    """배칭 엔진 상태를 /metrics 에 노출 (모델을 직접 돌리는 프로세스에서 1번만 호출)."""
+    CallbackGauge(
+        "aiary_kobart_queue_depth",
+        "KoBART 배칭 엔진 대기 요청 수",
+        lambda: engine.stats()["queue_depth"],
+    )
+    CallbackGauge(
+        "aiary_kobart_processing",
+        "KoBART 배칭 엔진이 지금 처리 중인 배치 크기",
+        lambda: engine.stats()["processing"],
+    )
+    CallbackGauge(
+        "aiary_kobart_avg_batch_size",
+        "KoBART 배칭 엔진 평균 배치 크기",
+        lambda: engine.stats()["avg_batch_size"],
+    )
+    CallbackGauge(
+        "aiary_kobart_slots_busy",
+        "KoBART generate 슬롯 중 실행 중인 수",
+        lambda: scheduler.stats()["running"],
+    )
+    CallbackGauge(
+        "aiary_kobart_slots_waiting",
+        "빈 generate 슬롯을 기다리는 작업 수",
+        lambda: scheduler.stats()["waiting"],
+    )
+
+
+# 5) 토큰 스트리밍 (SSE 응답용, 요청 1건씩 generate)
+
+class _QueueStreamer(TextStreamer):
+    """generate 쓰레드에서 디코딩된 텍스트 조각을 event loop 쪽 asyncio.Queue 로 넘기는 streamer."""
+
+    def __init__(self, tokenizer, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        # encoder-decoder 는 첫 put 이 decoder 시작 토큰이라 skip_prompt 로 건너뜀
+        super().__init__(tokenizer, skip_prompt=True, skip_special_tokens=True)
+        self.loop = loop
+        self.queue = queue
+
+    def on_finalized_text(self, text: str, stream_end: bool = False):
+        if text:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, text)
+
+
+class _CancelCriteria(StoppingCriteria):
+    """클라이언트가 연결을 끊으면(event set) 다음 토큰에서 generate 를 멈춤."""
+
+    def __init__(self, event: threading.Event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full(
+            (input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device
+        )
+
+
+_STREAM_END = object()
+
+
+def _generate_streaming(
+    summary_text: str,
+    preset: str,
+    max_len: int | None,
+    streamer: _QueueStreamer,
+    cancel: threading.Event,
+) -> None:
+    """쓰레드에서 실행: generate 하면서 streamer 로 텍스트 조각을 흘려보냄. 끝나면 종료 표시(또는 예외)를 넣음."""
+    loop, queue = streamer.loop, streamer.queue
+    try:
+        _load_model_if_needed()
+        # tokenizer 는 모델 로드 후에 생기므로 여기서 연결
+        streamer.tokenizer = _tokenizer
+
+        with stage_timer("kobart_tokenize"):
+            enc = _tokenizer(
+                [f"[SUMMARY]\n{summary_text}\n[DIARY]"],
+                max_length=MAX_INPUT_LEN,
+                truncation=True,
+                return_tensors="pt",
+            )
+
+        kwargs = _generation_kwargs(preset, max_len)
+        # beam search 는 토큰 단위 streamer 를 지원하지 않으므로 다 만든 뒤 한 번에 보냄
+        beam = kwargs.get("num_beams", 1) > 1
+
+        start = time.perf_counter()
+        with torch.no_grad():
+            outputs = _model.generate(
+                input_ids=enc["input_ids"].to(_device),
+                attention_mask=enc["attention_mask"].to(_device),
+                streamer=None if beam else streamer,
+                stopping_criteria=StoppingCriteriaList([_CancelCriteria(cancel)]),
+                **kwargs,
+            )
+        _record_generate(outputs, time.perf_counter() - start)
+        if beam:
+            text = _tokenizer.decode(outputs[0], skip_special_tokens=True)
+            loop.call_soon_threadsafe(queue.put_nowait, clean_generated_text(text))
+        loop.call_soon_threadsafe(queue.put_nowait, _STREAM_END)
+    except Exception as e:
+        loop.call_soon_threadsafe(queue.put_nowait, e)
+
+
+async def stream_summary_local(
+    summary_text: str, preset: str, max_len: int | None = None
+) -> AsyncIterator[str]:
+    """
+    이 프로세스에 로드한 모델로 요약 문자열 1건을 스트리밍 generate.
+    (배칭 엔진을 거치지 않고 요청마다 generate 쓰레드 풀에서 generate)
+    결정적 프리셋은 메모된 결과가 있으면 전체 텍스트를 조각 하나로 보내고, 끝까지 생성하면 메모에 저장.
+    """
+    memo_key = _memo_key(summary_text, preset, max_len)
+    memoized = _memo_get(memo_key, preset)
+    if memoized is not None:
+        yield memoized
+        return
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    cancel = threading.Event()
+    streamer = _QueueStreamer(_tokenizer, loop, queue)
+
+    task = loop.create_task(
+        scheduler.run(_generate_streaming, summary_text, preset, max_len, streamer, cancel)
+    )
+    # 중간에 끊긴 경우에도 쓰레드 쪽 예외가 조용히 정리되도록
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    started = time.perf_counter()
+    first = True
+    parts: List[str] = []
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_END:
+                if memo_key is not None:
+                    _memo.set(memo_key, clean_generated_text("".join(parts)))
+                return
+            if isinstance(item, Exception):
+                raise item
+            if first and settings.METRICS_ENABLED:
+                STAGE_LATENCY.observe(time.perf_counter() - started, stage="kobart_first_token")
+            first = False
+            parts.append(item)
+            yield item
+    finally:
+        # 클라이언트가 끊었으면 generate 도 멈추게 함
+        cancel.set()
+
+
+async def stream_daily_diary(
+    one_line_list: List[str], preset: str | None = None
+) -> AsyncIterator[str]:
+    """
+    generate_daily_diary 의 스트리밍 버전.
+    KoBART 가 만드는 텍스트를 단어 단위로 바로바로 돌려줌.
+    (최종 텍스트는 조각들을 이어 붙인 뒤 clean_generated_text 로 정리)
+    """
+    preset = resolve_preset(preset)
+    summary_text = build_summary_bullets(one_line_list)["combined_summary"]
+
+    if inference_client.is_remote():
+        chunks = inference_client.stream(summary_text, preset)
+    else:
+        chunks = stream_summary_local(summary_text, preset)
+
+    async with aclosing(chunks):
+        async for text in chunks:
+            yield text
+
+
+# 6) FastAPI에서 쓸 비동기 래퍼
+
+async def generate_daily_diary(
+    one_line_list: List[str], preset: str | None = None
+) -> Dict[str, object]:
     """
     FastAPI 엔드포인트에서 호출할 비동기 래퍼.
 
     - one_line_list: DB에서 가져온 '한 줄 일기' 문자열 리스트
+    - preset: "fast" / "standard" / "quality" (None 이면 settings.KOBART_PRESET)
     - 내부에서:
         1) build_summary_bullets 로 bullet 요약 생성
-        2) generate_diary_from_summary 로 KoBART 줄글 생성
+        2) 배칭 엔진(engine)을 통해 KoBART 줄글 생성
     - 반환:
         {
           "generated_diary": "줄글 텍스트 ...",
           "bullet_lines": ["1. ...", "2. ...", ...],
-          "combined_summary": "1. ...\\n2. ...\\n..."
+          "combined_summary": "1. ...\\n2. ...\\n...",
+          "preset": "standard"
         }
     """
-    from anyio import to_thread  # anyio는 FastAPI에 기본 포함
+    preset = resolve_preset(preset)
 
-    def _run():
-        # 1) 한 줄 일기들로부터 bullet 요약 생성
-        summary_info = build_summary_bullets(one_line_list)
+    # 1) 한 줄 일기들로부터 bullet 요약 생성 (가벼운 문자열 처리)
+    summary_info = build_summary_bullets(one_line_list)
 
-        # 2) KoBART 호출 -> 하루 줄글 일기 생성
-        diary_text = generate_diary_from_summary(summary_info["combined_summary"])
+    # 2) KoBART 호출 -> 하루 줄글 일기 생성
+    #    동시에 들어온 다른 요청들과 함께 배치로 묶여서 generate 전용 쓰레드 풀에서 실행됨
+    #    (KOBART_INFERENCE_URL 이 있으면 추론 프로세스의 배칭 엔진에서)
+    if inference_client.is_remote():
+        diary_text = await inference_client.generate(summary_info["combined_summary"], preset)
+    else:
+        diary_text = await generate_summary_local(summary_info["combined_summary"], preset)
 
-        return {
-            "generated_diary": diary_text,
-            "bullet_lines": summary_info["bullet_lines"],
-            "combined_summary": summary_info["combined_summary"],
-        }
-
-    # 모델 추론은 CPU/GPU 연산이므로,
-    # 메인 event loop 를 막지 않도록 쓰레드 풀에서 실행
-    result = await to_thread.run_sync(_run)
-    return result
+    return {
+        "generated_diary": diary_text,
+        "bullet_lines": summary_info["bullet_lines"],
+        "combined_summary": summary_info["combined_summary"],
+        "preset": preset,
+    }
@@ -0,0 +1,168 @@
+# app/services/daily_diary_store.py
+from __future__ import annotations
+
+import datetime
+import hashlib
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.model import DailyDiary, Diary
+
+# DailyDiary.generator 값
+GENERATOR_KOBART = "kobart"
+GENERATOR_GPT_SUMMARY = "gpt_summary"
+
+
+def kobart_generator(preset: str) -> str:
+    """
+    KoBART 프리셋별 DailyDiary.generator 값.
+    미리보기(fast) 결과가 최종 일기 자리에 저장되지 않도록 프리셋마다 따로 저장 ("standard" 는 기존 "kobart").
+    """
+    return GENERATOR_KOBART if preset == "standard" else f"{GENERATOR_KOBART}_{preset}"
+
+
+# 최종 하루 일기로 치는 generator (fast 미리보기 저장본은 제외, 캘린더의 has_day_diary 등)
+FINAL_GENERATORS = (GENERATOR_KOBART, kobart_generator("quality"), GENERATOR_GPT_SUMMARY)
+
+
+def compute_fingerprint(diaries: List[Diary]) -> str:
+    """
+    하루치 Diary 행들의 (id, content) 로 만든 sha256.
+    그날 한 줄 일기가 추가/삭제/수정되면 값이 달라짐.
+    """
+    h = hashlib.sha256()
+    for d in sorted(diaries, key=lambda d: d.id):
+        h.update(f"{d.id}\x00{d.content}\x00".encode("utf-8"))
+    return h.hexdigest()
+
+
+async def _load(
+    db: AsyncSession, user_id: int, diary_date: datetime.date, generator: str
+) -> Optional[DailyDiary]:
+    result = await db.execute(
+        select(DailyDiary)
+        .where(DailyDiary.user_id == user_id)
+        .where(DailyDiary.diary_date == diary_date)
+        .where(DailyDiary.generator == generator)
+    )
+    return result.scalars().first()
+
+
+async def list_for_day(
+    db: AsyncSession, user_id: int, diary_date: datetime.date
+) -> List[DailyDiary]:
+    """그날 저장된 하루 일기 전부 (generator 별 1개)."""
+    result = await db.execute(
+        select(DailyDiary)
+        .where(DailyDiary.user_id == user_id)
+        .where(DailyDiary.diary_date == diary_date)
+        .order_by(DailyDiary.generator.asc())
+    )
+    return list(result.scalars().all())
+
+
+async def _upsert(
+    db: AsyncSession,
+    user_id: int,
+    diary_date: datetime.date,
+    generator: str,
+    fingerprint: str,
+    source_count: int,
+    content: str,
+) -> None:
+    """(user_id, diary_date, generator) 기준 upsert. 동시에 생성된 경우 나중 결과로 덮어씀."""
+    now = datetime.datetime.utcnow()
+    values = {
+        "user_id": user_id,
+        "diary_date": diary_date,
+        "generator": generator,
+        "source_fingerprint": fingerprint,
+        "source_count": source_count,
+        "content": content,
+        "created_at": now,
+        "updated_at": now,
+    }
+    update_values = {
+        "source_fingerprint": fingerprint,
+        "source_count": source_count,
+        "content": content,
+        "updated_at": now,
+    }
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        existing = await _load(db, user_id, diary_date, generator)
+        if existing is None:
+            db.add(DailyDiary(**values))
+        else:
+            for key, value in update_values.items():
+                setattr(existing, key, value)
+        return
+
+    stmt = insert(DailyDiary).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "diary_date", "generator"],
+        set_=update_values,
+    )
+    await db.execute(stmt)
+
+
+async def load_current(
+    db: AsyncSession,
+    user_id: int,
+    diary_date: datetime.date,
+    generator: str,
+    fingerprint: str,
+) -> Optional[str]:
+    """저장된 하루 일기가 있고 원본 Diary 들이 그대로(fingerprint 일치)면 그 텍스트, 아니면 None."""
+    stored = await _load(db, user_id, diary_date, generator)
+    if stored is not None and stored.source_fingerprint == fingerprint:
+        return stored.content
+    return None
+
+
+async def save_daily(
+    db: AsyncSession,
+    user_id: int,
+    diary_date: datetime.date,
+    generator: str,
+    fingerprint: str,
+    source_count: int,
+    content: str,
+) -> None:
+    """새로 만든 하루 일기를 저장(upsert) 하고 commit."""
+    await _upsert(db, user_id, diary_date, generator, fingerprint, source_count, content)
+    await db.commit()
+
+
+async def get_or_generate_daily(
+    db: AsyncSession,
+    user_id: int,
+    diary_date: datetime.date,
+    generator: str,
+    diaries: List[Diary],
+    generate: Callable[[], Awaitable[str]],
+    regenerate: bool = False,
+) -> tuple[str, bool]:
+    """
+    저장된 하루 일기가 있고 원본 Diary 들이 그대로면 저장본을 돌려주고,
+    아니면(또는 regenerate=True 면) generate() 로 새로 만들어 저장.
+    반환: (하루 일기 텍스트, 저장본 재사용 여부)
+    """
+    fingerprint = compute_fingerprint(diaries)
+
+    if not regenerate:
+        stored = await load_current(db, user_id, diary_date, generator, fingerprint)
+        if stored is not None:
+            return stored, True
+
+    content = await generate()
+
+    await save_daily(db, user_id, diary_date, generator, fingerprint, len(diaries), content)
+    return content, False
@@ -0,0 +1,96 @@
+# app/services/http_cache.py
+from __future__ import annotations
+
+import datetime
+import hashlib
+import re
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from fastapi.staticfiles import StaticFiles
+
+# 내용 해시가 파일명인 미디어(원본/축소본)는 바뀌지 않으므로 1년 + immutable
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# 유저별 JSON 응답: 클라이언트가 저장은 하되 매번 ETag 로 재검증
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+_CONTENT_ADDRESSED_RE = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+
+
+def make_etag(*parts: Any) -> str:
+    """응답 내용을 대표하는 값들로 만든 strong ETag."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\x00")
+    return f'"{h.hexdigest()[:32]}"'
+
+
+def _http_date(dt: datetime.datetime) -> str:
+    # DB 의 created_at/updated_at 은 UTC naive
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return format_datetime(dt, usegmt=True)
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime.datetime] = None
+) -> bool:
+    """
+    If-None-Match / If-Modified-Since 로 클라이언트 캐시가 최신인지 확인.
+    If-None-Match 가 있으면 그것만 봄 (RFC 9110).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # weak 비교 (W/ 접두어 무시)
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=datetime.timezone.utc)
+        # HTTP 날짜는 초 단위라 Last-Modified 헤더는 초 아래를 버린 값
+        # -> 같은 초 안에 나중에 추가된 일기를 놓치지 않도록 다음 초로 올려서 비교
+        if last_modified.microsecond:
+            last_modified = last_modified.replace(microsecond=0) + datetime.timedelta(seconds=1)
+        return last_modified <= since
+    return False
+
+
+def set_cache_headers(
+    response: Response, etag: str, last_modified: Optional[datetime.datetime] = None
+) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+    if last_modified is not None:
+        response.headers["Last-Modified"] = _http_date(last_modified)
+
+
+def not_modified(etag: str, last_modified: Optional[datetime.datetime] = None) -> Response:
+    """본문 없는 304 응답 (검증용 헤더는 그대로 포함)."""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, last_modified)
+    return response
+
+
+def is_content_addressed(filename: str) -> bool:
+    """파일명이 내용 sha256 인지 (해시 파일명 이전에 저장된 사진은 False)."""
+    return bool(_CONTENT_ADDRESSED_RE.match(filename))
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """해시 파일명 미디어에 immutable Cache-Control 을 붙이는 StaticFiles."""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if is_content_addressed(str(full_path).rsplit("/", 1)[-1]):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
@@ -0,0 +1,145 @@
+# app/services/image_derivatives.py
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from anyio import CapacityLimiter, to_thread
+
+from app.config import settings
+from app.services.image_processor import preprocess_image_sync
+
+# 원본: media/images/{sha256}.{ext}
+# 축소본: media/derived/{size}/{sha256}.{webp|jpg}
+MEDIA_DIR = Path("media")
+IMAGES_DIR = MEDIA_DIR / "images"
+DERIVED_DIR = MEDIA_DIR / "derived"
+
+# 크기 이름 -> 긴 변 길이
+DERIVATIVE_SIZES: Dict[str, int] = {
+    "thumb": settings.IMAGE_THUMB_EDGE,
+    "medium": settings.IMAGE_MEDIUM_EDGE,
+}
+
+# 원본 파일명: 내용 sha256 (diary._generate_filename) 또는 그 이전의 "YYYYMMDD_HHMMSS_<hex>"
+# 경로 구분자 / 점이 들어간 이름은 받지 않음 (경로 탐색 방지)
+_STEM_RE = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+_FORMAT_EXT = {
+    "JPEG": ".jpg",
+    "WEBP": ".webp",
+}
+
+# 축소본 전용 쓰레드 수 제한 (최초 1회만 생성)
+_limiter: Optional[CapacityLimiter] = None
+
+# 생성 중인 축소본 (같은 파일을 동시에 두 번 만들지 않도록 공유)
+_pending: Dict[Path, asyncio.Task] = {}
+# 업로드 직후 띄운 백그라운드 작업 (GC 로 사라지지 않게 참조 유지)
+_background: Set[asyncio.Task] = set()
+
+
+def _get_limiter() -> CapacityLimiter:
+    global _limiter
+
+    if _limiter is None:
+        _limiter = CapacityLimiter(settings.IMAGE_DERIVATIVE_WORKERS)
+    return _limiter
+
+
+def _derivative_ext() -> str:
+    return _FORMAT_EXT[settings.IMAGE_DERIVATIVE_FORMAT.upper()]
+
+
+def derivative_path(size: str, stem: str) -> Path:
+    return DERIVED_DIR / size / f"{stem}{_derivative_ext()}"
+
+
+def derivative_urls(image_url: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    image_url("/media/images/xxx.jpg") 에 대응하는 축소본 URL.
+    파일이 아직 없어도 URL 은 바로 쓸 수 있음 (첫 요청 때 생성).
+    """
+    urls: Dict[str, Optional[str]] = {"thumbnail_url": None, "medium_url": None}
+    if not image_url or not image_url.startswith("/media/images/"):
+        return urls
+
+    stem = Path(image_url).stem
+    if not _STEM_RE.fullmatch(stem):
+        return urls
+    ext = _derivative_ext()
+    urls["thumbnail_url"] = f"/media/derived/thumb/{stem}{ext}"
+    urls["medium_url"] = f"/media/derived/medium/{stem}{ext}"
+    return urls
+
+
+def _find_original(stem: str) -> Optional[Path]:
+    """확장자와 상관없이 같은 이름의 원본 파일 찾기."""
+    for path in IMAGES_DIR.glob(f"{stem}.*"):
+        if path.is_file():
+            return path
+    return None
+
+
+def _render_sync(original: Path, size: str, target: Path) -> Path:
+    """원본을 읽어 축소/재인코딩한 뒤 임시 파일 -> rename 으로 저장 (반쯤 쓴 파일이 보이지 않게)."""
+    processed = preprocess_image_sync(
+        original,
+        max_edge=DERIVATIVE_SIZES[size],
+        output_format=settings.IMAGE_DERIVATIVE_FORMAT,
+        quality=settings.IMAGE_DERIVATIVE_QUALITY,
+    )
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(processed.data)
+    os.replace(tmp, target)
+    return target
+
+
+async def ensure_derivative(size: str, stem: str) -> Optional[Path]:
+    """
+    축소본 파일 경로를 반환. 없으면 원본에서 만들어 디스크에 저장.
+    원본이 없으면 None.
+    """
+    if size not in DERIVATIVE_SIZES or not _STEM_RE.fullmatch(stem):
+        return None
+
+    target = derivative_path(size, stem)
+    if target.exists():
+        return target
+
+    task = _pending.get(target)
+    if task is None:
+        original = _find_original(stem)
+        if original is None:
+            return None
+
+        task = asyncio.create_task(
+            to_thread.run_sync(
+                _render_sync, original, size, target, limiter=_get_limiter()
+            )
+        )
+        _pending[target] = task
+        task.add_done_callback(lambda _: _pending.pop(target, None))
+
+    return await asyncio.shield(task)
+
+
+def schedule_derivatives(image_url: str) -> None:
+    """업로드 직후 호출: 모든 크기의 축소본을 백그라운드에서 생성 (응답은 기다리지 않음)."""
+    stem = Path(image_url).stem
+
+    async def _run():
+        for size in DERIVATIVE_SIZES:
+            try:
+                await ensure_derivative(size, stem)
+            except Exception as e:
+                # 실패해도 첫 요청 때 다시 시도하므로 경고만 남김
+                print(f"[WARN] 축소본 생성 실패 ({size}/{stem}): {e}", flush=True)
+
+    task = asyncio.create_task(_run())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
@@ -0,0 +1,133 @@
+# app/services/image_processor.py
+from __future__ import annotations
+
+import io
+import os
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from anyio import CapacityLimiter, to_thread
+from fastapi import HTTPException
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.config import settings
+
+# HEIC/HEIF(아이폰 사진) 디코딩은 pillow-heif 가 설치된 경우에만 지원
+try:
+    from pillow_heif import register_heif_opener
+
+    register_heif_opener()
+except ImportError:  # 선택 의존성
+    pass
+
+# 저장 포맷 -> MIME 타입
+_FORMAT_MIME = {
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+}
+
+# 원본 바이트 또는 디스크에 저장된 원본 파일 경로
+ImageSource = Union[bytes, str, os.PathLike]
+
+# 전처리 전용 쓰레드 수 제한 (최초 1회만 생성)
+_limiter: Optional[CapacityLimiter] = None
+
+
+@dataclass
+class ProcessedImage:
+    """비전 호출에 넘길 전처리된 이미지."""
+    data: bytes
+    mime_type: str
+    width: int
+    height: int
+
+
+def _get_limiter() -> CapacityLimiter:
+    global _limiter
+
+    if _limiter is None:
+        _limiter = CapacityLimiter(settings.IMAGE_PREPROCESS_WORKERS)
+    return _limiter
+
+
+def _to_rgb(img: Image.Image) -> Image.Image:
+    """투명 배경(PNG 등)은 흰 배경에 합성해서 RGB로 변환."""
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    if img.mode != "RGB":
+        return img.convert("RGB")
+    return img
+
+
+def preprocess_image_sync(
+    source: ImageSource,
+    max_edge: int | None = None,
+    output_format: str | None = None,
+    quality: int | None = None,
+) -> ProcessedImage:
+    """
+    업로드된 원본 사진을 비전 모델 입력용으로 줄이는 함수.
+    파일 경로를 넘기면 원본 전체를 메모리에 올리지 않고 파일에서 바로 디코딩.
+
+    1) 디코딩 (JPEG 는 draft 모드로 축소 디코딩)
+    2) EXIF 방향 정보대로 회전
+    3) 긴 변을 max_edge 이하로 축소
+    4) JPEG/WebP 로 다시 인코딩
+    """
+    max_edge = max_edge or settings.IMAGE_MAX_EDGE
+    output_format = (output_format or settings.IMAGE_OUTPUT_FORMAT).upper()
+    quality = quality or settings.IMAGE_QUALITY
+
+    if output_format not in _FORMAT_MIME:
+        raise ValueError(f"지원하지 않는 출력 포맷입니다: {output_format}")
+
+    try:
+        img = Image.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+        # JPEG 는 DCT 스케일링으로 필요한 크기 근처까지만 디코딩 (CPU/메모리 절약)
+        img.draft("RGB", (max_edge, max_edge))
+        img = ImageOps.exif_transpose(img)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise HTTPException(status_code=400, detail="지원하지 않는 이미지 형식입니다.")
+
+    img = _to_rgb(img)
+    img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+    buf = io.BytesIO()
+    save_kwargs = {"quality": quality}
+    if output_format == "JPEG":
+        save_kwargs.update(optimize=True, progressive=True)
+    img.save(buf, format=output_format, **save_kwargs)
+
+    return ProcessedImage(
+        data=buf.getvalue(),
+        mime_type=_FORMAT_MIME[output_format],
+        width=img.width,
+        height=img.height,
+    )
+
+
+def verify_image_sync(source: Union[str, os.PathLike]) -> None:
+    """이미지로 읽을 수 있는 파일인지 확인 (헤더/구조만 검사, 픽셀 디코딩은 하지 않음)."""
+    try:
+        with Image.open(source) as img:
+            img.verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise HTTPException(status_code=400, detail="지원하지 않는 이미지 형식입니다.")
+
+
+async def verify_image(source: Union[str, os.PathLike]) -> None:
+    """업로드 파일을 저장 위치로 옮기기 전에 호출 (쓰레드 풀에서 실행)."""
+    await to_thread.run_sync(verify_image_sync, source, limiter=_get_limiter())
+
+
+async def preprocess_image(source: ImageSource) -> ProcessedImage:
+    """
+    FastAPI 엔드포인트에서 호출할 비동기 래퍼.
+    디코딩/리사이즈는 CPU 연산이므로 event loop 를 막지 않도록 쓰레드 풀에서 실행.
+    """
+    return await to_thread.run_sync(
+        preprocess_image_sync, source, limiter=_get_limiter()
+    )
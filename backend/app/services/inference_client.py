@@ -0,0 +1,130 @@
+# app/services/inference_client.py
+from __future__ import annotations
+
+import json
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+from fastapi import HTTPException
+
+from app.config import settings
+
+# 별도 KoBART 추론 프로세스(inference_server.py)와 통신하는 클라이언트.
+# - KOBART_INFERENCE_URL 이 설정되어 있으면 API 워커는 모델을 로드하지 않고 여기로 요청을 보냄
+# - 여러 워커의 요청이 추론 프로세스 한 곳의 배칭 엔진에 모이므로
+#   모델 메모리와 추론 동시성이 워커 수와 상관없이 한 곳에서 정해짐
+
+UDS_PREFIX = "unix://"
+
+# 프로세스 전체에서 공유하는 클라이언트 (최초 1회만 생성)
+_client: Optional[httpx.AsyncClient] = None
+
+
+def is_remote() -> bool:
+    return bool(settings.KOBART_INFERENCE_URL)
+
+
+def get_client() -> httpx.AsyncClient:
+    """KOBART_INFERENCE_URL 에 맞는 httpx 클라이언트 ("unix:///경로" 면 Unix 도메인 소켓)."""
+    global _client
+
+    if _client is not None:
+        return _client
+
+    url = settings.KOBART_INFERENCE_URL
+    timeout = httpx.Timeout(settings.KOBART_INFERENCE_TIMEOUT, connect=5.0)
+    if url.startswith(UDS_PREFIX):
+        _client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(uds=url[len(UDS_PREFIX):]),
+            base_url="http://kobart",
+            timeout=timeout,
+        )
+    else:
+        _client = httpx.AsyncClient(base_url=url, timeout=timeout)
+    return _client
+
+
+async def close_client() -> None:
+    """앱 종료 시 커넥션 정리."""
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _unavailable(e: Exception) -> HTTPException:
+    # 추론 서버가 떠 있지 않거나 재시작 중 -> 잠시 후 재시도할 수 있는 503
+    return HTTPException(status_code=503, detail=f"KoBART 추론 서버에 연결할 수 없습니다: {e}")
+
+
+def _raise_for_status(response: httpx.Response) -> None:
+    if response.status_code < 400:
+        return
+    try:
+        detail = response.json().get("detail", response.text)
+    except ValueError:
+        detail = response.text
+    if response.status_code >= 500:
+        raise RuntimeError(f"KoBART 추론 서버 오류 ({response.status_code}): {detail}")
+    raise HTTPException(status_code=response.status_code, detail=detail)
+
+
+async def generate(summary_text: str, preset: str, max_len: Optional[int] = None) -> str:
+    """요약 문자열 1건 -> 하루 일기 텍스트 (추론 서버의 배칭 엔진을 거침)."""
+    try:
+        response = await get_client().post(
+            "/generate", json={"summary": summary_text, "preset": preset, "max_len": max_len}
+        )
+    except httpx.TransportError as e:
+        raise _unavailable(e)
+    _raise_for_status(response)
+    return response.json()["text"]
+
+
+async def stream(
+    summary_text: str, preset: str, max_len: Optional[int] = None
+) -> AsyncIterator[str]:
+    """
+    generate 의 스트리밍 버전. 추론 서버가 보내는 NDJSON 줄({"text": ...})을 조각으로 돌려줌.
+    중간에 그만 읽으면 연결이 끊기고, 추론 서버 쪽 generate 도 멈춤.
+    """
+    try:
+        async with get_client().stream(
+            "POST",
+            "/generate/stream",
+            json={"summary": summary_text, "preset": preset, "max_len": max_len},
+        ) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                _raise_for_status(response)
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                message = json.loads(line)
+                if "error" in message:
+                    raise RuntimeError(f"KoBART 추론 서버 오류: {message['error']}")
+                if "text" in message:
+                    yield message["text"]
+    except httpx.TransportError as e:
+        raise _unavailable(e)
+
+
+async def readiness() -> Dict[str, object]:
+    """추론 서버의 /health/ready 결과 (연결 실패도 not ready 로)."""
+    try:
+        response = await get_client().get("/health/ready", timeout=5.0)
+        status = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        status = {"ready": False, "error": str(e)}
+    return {**status, "inference_url": settings.KOBART_INFERENCE_URL}
+
+
+async def stats() -> Dict[str, object]:
+    """추론 서버의 배칭 엔진 상태."""
+    try:
+        response = await get_client().get("/stats", timeout=5.0)
+    except httpx.TransportError as e:
+        raise _unavailable(e)
+    _raise_for_status(response)
+    return response.json()
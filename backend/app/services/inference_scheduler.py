@@ -0,0 +1,105 @@
+# app/services/inference_scheduler.py
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import torch
+
+
+class InferenceScheduler:
+    """
+    모델 추론(generate) 전용 쓰레드 풀.
+
+    - AnyIO 기본 쓰레드 풀(비밀번호 해시, 파일 저장 등 다른 블로킹 작업용)과 분리해서
+      동시에 도는 generate 수를 slots 개로 고정함.
+    - torch intra-op 쓰레드 수는 프로세스 전역 설정이라 executor 를 만들 때 1번 intra_op_threads 로 설정
+      (슬롯마다 따로 잡히지 않음, 동시에 도는 generate 들이 같은 설정을 씀)
+      -> slots x intra_op_threads 를 코어 수에 맞춰 정하면 연산이 겹쳐도 과다 구독이 크지 않음
+    - slots 를 넘는 요청은 executor 큐에서 순서대로 기다림.
+    """
+
+    def __init__(
+        self,
+        slots: int = 1,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+        name: str = "inference",
+    ):
+        self.slots = max(1, slots)
+        # 0 이면 torch 기본 쓰레드 수(보통 물리 코어 수)를 슬롯 수로 나눠 씀
+        self.intra_op_threads = intra_op_threads or max(1, torch.get_num_threads() // self.slots)
+        # 0 이면 torch 기본값 유지
+        self.inter_op_threads = inter_op_threads
+        self.name = name
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # 메트릭
+        self._submitted = 0
+        self._running = 0
+        self._completed = 0
+
+    # ---------- 수명 주기 ----------
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # intra-op 쓰레드 수는 프로세스 전역 설정 (다른 torch 사용처에도 적용됨)
+                torch.set_num_threads(self.intra_op_threads)
+                if self.inter_op_threads:
+                    # inter-op 쓰레드 수는 프로세스에서 병렬 작업이 시작되기 전에 1번만 바꿀 수 있음
+                    try:
+                        torch.set_num_interop_threads(self.inter_op_threads)
+                    except RuntimeError as e:
+                        print(f"[WARN] torch inter-op 쓰레드 수를 바꾸지 못했습니다: {e}", flush=True)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.slots,
+                    thread_name_prefix=self.name,
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        """executor 종료 (앱 shutdown 시 호출). 아직 시작 안 한 작업은 취소됨."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    # ---------- 실행 ----------
+
+    def _call(self, fn: Callable[..., Any], args: tuple) -> Any:
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """블로킹 함수 fn(*args) 를 추론 전용 쓰레드에서 실행하고 결과를 돌려받음."""
+        loop = asyncio.get_running_loop()
+        self._submitted += 1
+        try:
+            return await loop.run_in_executor(self._get_executor(), self._call, fn, args)
+        finally:
+            self._submitted -= 1
+
+    # ---------- 메트릭 ----------
+
+    def stats(self) -> Dict[str, Any]:
+        """슬롯 / 쓰레드 설정과 지금 실행 중·대기 중인 작업 수."""
+        running = self._running
+        return {
+            "slots": self.slots,
+            "intra_op_threads": self.intra_op_threads,
+            "inter_op_threads": self.inter_op_threads or torch.get_num_interop_threads(),
+            "running": running,
+            "waiting": max(0, self._submitted - running),
+            "completed_total": self._completed,
+        }
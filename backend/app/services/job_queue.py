@@ -0,0 +1,375 @@
+# app/services/job_queue.py
+from __future__ import annotations
+
+import asyncio
+import datetime
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.database import AsyncSessionLocal
+from app.db.model import GenerationJob
+
+# job 상태
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+TERMINAL_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED)
+
+# handler(db, job_id, payload) -> JSON 으로 저장 가능한 결과
+JobHandler = Callable[[AsyncSession, str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+# _run_one 에서 handler 가 아직 결과를 돌려주지 않았음을 나타내는 값
+_PENDING = object()
+
+
+def job_to_dict(job: GenerationJob) -> Dict[str, Any]:
+    """상태 조회 API 응답 형태."""
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
+
+
+class JobQueue:
+    """
+    DB(generation_jobs 테이블)에 상태를 저장하고,
+    같은 프로세스 안의 asyncio 워커들이 처리하는 작업 큐.
+
+    - 외부 브로커 없이 동작 (작업 목록/결과는 DB에 남으므로 상태 조회는 어느 워커에서든 가능)
+    - 실패 시 JOB_MAX_ATTEMPTS 까지 재시도 (4xx HTTPException 은 재시도하지 않음)
+    - Idempotency-Key 가 같으면 새 job 을 만들지 않고 기존 job 을 돌려줌
+    - 실행 중에는 JOB_HEARTBEAT_INTERVAL 마다 updated_at 을 갱신
+      (다른 프로세스가 startup 때 살아 있는 job 을 복구 대상으로 잡지 않도록)
+    - 상태 변경은 running 인 job 에만 적용 (handler 가 결과와 함께 succeeded 로 바꿨으면 덮어쓰지 않음)
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        # 같은 프로세스에서 기다리는 long-poll/SSE 를 바로 깨우기 위한 이벤트
+        # (기다리는 쪽이 없어지면 자동으로 빠지도록 약한 참조로 보관)
+        self._events: "weakref.WeakValueDictionary[str, asyncio.Event]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    # ---------- 수명 주기 ----------
+
+    async def start(self) -> None:
+        """
+        워커 시작 + 이전 프로세스에서 처리되지 못한 job 다시 넣기.
+        (queued job + 프로세스가 죽어서 running 으로 남은 job)
+        """
+        if self._workers:
+            return
+
+        self._queue = asyncio.Queue()
+        for _ in range(max(1, settings.JOB_WORKERS)):
+            self._workers.append(asyncio.create_task(self._worker()))
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await self._recover_running(db)
+                result = await db.execute(
+                    select(GenerationJob.id)
+                    .where(GenerationJob.status == STATUS_QUEUED)
+                    .order_by(GenerationJob.created_at.asc())
+                )
+                for job_id in result.scalars().all():
+                    self._queue.put_nowait(job_id)
+        except Exception as e:
+            # DB 가 아직 준비되지 않았어도 서버는 떠야 하므로 경고만 남김
+            print(f"[WARN] 대기 중인 job 복구 실패: {e}", flush=True)
+
+    async def _recover_running(self, db: AsyncSession) -> None:
+        """
+        running 인 채로 JOB_RUNNING_LEASE 초 넘게 갱신되지 않은 job 을 queued 로 되돌림.
+        (실행 중인 job 은 heartbeat 로 계속 갱신되고 정상 종료 때는 _run_one 에서 되돌리므로
+         여기서는 강제 종료 / 크래시로 heartbeat 가 끊긴 job 만 해당)
+        """
+        stmt = update(GenerationJob).where(GenerationJob.status == STATUS_RUNNING)
+        if settings.JOB_RUNNING_LEASE > 0:
+            cutoff = datetime.datetime.utcnow() - datetime.timedelta(
+                seconds=settings.JOB_RUNNING_LEASE
+            )
+            stmt = stmt.where(GenerationJob.updated_at < cutoff)
+        result = await db.execute(
+            stmt.values(status=STATUS_QUEUED, updated_at=datetime.datetime.utcnow())
+        )
+        await db.commit()
+        if result.rowcount:
+            print(f"[INFO] 끝나지 못한 running job {result.rowcount}건을 다시 queued 로 되돌림", flush=True)
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        for task in self._workers:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+        self._queue = None
+
+    # ---------- 등록 ----------
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        kind: str,
+        user_id: int,
+        payload: Dict[str, Any],
+        idempotency_key: Optional[str] = None,
+    ) -> tuple[GenerationJob, bool]:
+        """
+        job 을 DB 에 저장하고 워커 큐에 넣음.
+        반환: (job, 새로 만들었는지 여부). 같은 Idempotency-Key 면 기존 job.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"등록되지 않은 job 종류입니다: {kind}")
+
+        if idempotency_key:
+            existing = await self.find(db, user_id, idempotency_key)
+            if existing is not None:
+                return existing, False
+
+        job = GenerationJob(
+            id=uuid4().hex,
+            user_id=user_id,
+            kind=kind,
+            status=STATUS_QUEUED,
+            idempotency_key=idempotency_key,
+            payload=payload,
+            attempts=0,
+        )
+        db.add(job)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # 같은 키로 동시에 들어온 재시도 -> 먼저 저장된 job 사용
+            await db.rollback()
+            existing = await self.find(db, user_id, idempotency_key)
+            if existing is None:
+                raise
+            return existing, False
+
+        await db.refresh(job)
+        self._put(job.id)
+        return job, True
+
+    async def find(
+        self, db: AsyncSession, user_id: int, idempotency_key: str
+    ) -> Optional[GenerationJob]:
+        """(user_id, Idempotency-Key) 로 이미 등록된 job 찾기."""
+        result = await db.execute(
+            select(GenerationJob)
+            .where(GenerationJob.user_id == user_id)
+            .where(GenerationJob.idempotency_key == idempotency_key)
+        )
+        return result.scalars().first()
+
+    def _put(self, job_id: str) -> None:
+        if self._queue is None:
+            raise RuntimeError("job 워커가 시작되지 않았습니다. (startup 에서 start() 호출 필요)")
+        self._queue.put_nowait(job_id)
+
+    # ---------- 조회 / 대기 ----------
+
+    async def get(self, db: AsyncSession, job_id: str) -> Optional[GenerationJob]:
+        result = await db.execute(select(GenerationJob).where(GenerationJob.id == job_id))
+        return result.scalars().first()
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[GenerationJob]:
+        """
+        job 이 끝나거나(timeout 초 경과) 할 때까지 기다린 뒤 최신 상태를 반환 (long-poll 용).
+        다른 프로세스에서 처리 중인 job 도 있을 수 있으므로 짧은 간격으로 DB 도 다시 확인.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(0.0, timeout)
+
+        while True:
+            async with AsyncSessionLocal() as db:
+                job = await self.get(db, job_id)
+            if job is None or job.status in TERMINAL_STATUSES:
+                return job
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return job
+
+            # 지역 변수가 참조하는 동안만 _events 에 남음 (대기가 끝나면 자동으로 정리)
+            event = self._events.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), min(remaining, settings.JOB_POLL_INTERVAL))
+            except asyncio.TimeoutError:
+                pass
+
+    def _notify(self, job_id: str) -> None:
+        event = self._events.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    # ---------- 워커 ----------
+
+    async def _try_claim(self, job_id: str) -> bool:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id == job_id)
+                .where(GenerationJob.status == STATUS_QUEUED)
+                .values(
+                    status=STATUS_RUNNING,
+                    attempts=GenerationJob.attempts + 1,
+                    updated_at=datetime.datetime.utcnow(),
+                )
+            )
+            await db.commit()
+            return result.rowcount == 1
+
+    async def _claim(self, job_id: str) -> bool:
+        """queued -> running 으로 바꾼 워커만 실행 (중복 실행 방지)."""
+        claim = asyncio.ensure_future(self._try_claim(job_id))
+        try:
+            return await asyncio.shield(claim)
+        except asyncio.CancelledError:
+            # 도중에 취소돼도 claim 은 끝까지 진행시키고, 가져온 job 이면 다시 queued 로
+            if await claim:
+                await self._release(job_id)
+            raise
+
+    async def _release(self, job_id: str) -> None:
+        """취소(shutdown)로 실행하지 못한 job 을 queued 로 되돌림 (시도 횟수도 원래대로)."""
+        await self._finish(
+            job_id, status=STATUS_QUEUED, attempts=GenerationJob.attempts - 1
+        )
+
+    @staticmethod
+    def _running_job(job_id: str):
+        """running 인 job 만 바꾸는 UPDATE (이미 끝난 / 되돌려진 job 은 건드리지 않음)."""
+        return (
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id)
+            .where(GenerationJob.status == STATUS_RUNNING)
+        )
+
+    async def mark_succeeded(self, db: AsyncSession, job_id: str, result: Dict[str, Any]) -> None:
+        """
+        handler 의 트랜잭션 안에서 job 을 succeeded 로 바꿈 (commit 은 handler 가 결과 저장과 함께).
+        결과 저장과 상태가 같이 commit 되므로, 그 뒤에 취소돼도 job 이 다시 실행되지 않음.
+        """
+        await db.execute(
+            self._running_job(job_id).values(
+                status=STATUS_SUCCEEDED,
+                result=result,
+                error=None,
+                updated_at=datetime.datetime.utcnow(),
+            )
+        )
+
+    async def _update(self, job_id: str, values: Dict[str, Any]) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                self._running_job(job_id).values(updated_at=datetime.datetime.utcnow(), **values)
+            )
+            await db.commit()
+        self._notify(job_id)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        """handler 가 도는 동안 updated_at 을 주기적으로 갱신 (다른 프로세스의 복구 대상에서 제외)."""
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        self._running_job(job_id).values(updated_at=datetime.datetime.utcnow())
+                    )
+                    await db.commit()
+            except Exception as e:
+                print(f"[WARN] job {job_id} heartbeat 갱신 실패: {e}", flush=True)
+
+    async def _finish(self, job_id: str, **values) -> None:
+        # 상태 저장 도중 취소돼도 DB 반영은 끝까지 (running 으로 남지 않도록)
+        await asyncio.shield(self._update(job_id, values))
+
+    def _retry_later(self, job_id: str, delay: float) -> None:
+        def _requeue():
+            # 그 사이 stop() 되었다면 다음 startup 때 queued 상태로 다시 잡힘
+            if self._queue is not None:
+                self._queue.put_nowait(job_id)
+
+        asyncio.get_running_loop().call_later(delay, _requeue)
+
+    async def _run_one(self, job_id: str) -> None:
+        if not await self._claim(job_id):
+            return
+
+        result: Any = _PENDING
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            async with AsyncSessionLocal() as db:
+                attempts = 1  # job 을 읽기 전에 실패하면 1회차로 취급
+                try:
+                    job = await self.get(db, job_id)
+                    handler = self._handlers.get(job.kind)
+                    payload = dict(job.payload or {})
+                    attempts = job.attempts
+
+                    if handler is None:
+                        raise ValueError(f"등록되지 않은 job 종류입니다: {job.kind}")
+                    result = await handler(db, job_id, payload)
+                except Exception as e:
+                    await db.rollback()
+                    # 잘못된 요청(4xx)은 다시 해도 같으므로 바로 실패 처리
+                    retryable = not (isinstance(e, HTTPException) and e.status_code < 500)
+                    error = e.detail if isinstance(e, HTTPException) else str(e)
+
+                    if retryable and attempts < settings.JOB_MAX_ATTEMPTS:
+                        await self._finish(job_id, status=STATUS_QUEUED, error=str(error))
+                        self._retry_later(job_id, settings.JOB_RETRY_BACKOFF * (2 ** (attempts - 1)))
+                    else:
+                        await self._finish(job_id, status=STATUS_FAILED, error=str(error))
+                    return
+        except asyncio.CancelledError:
+            if result is _PENDING:
+                # stop() 으로 처리 도중 취소 -> 다음 startup(또는 다른 워커)에서 다시 처리하도록 queued 로
+                # (handler 가 이미 succeeded 로 commit 했으면 running 이 아니므로 그대로 유지됨)
+                await self._release(job_id)
+            else:
+                # handler 는 끝났고 세션 정리 중에 취소 -> running 으로 남지 않게 결과 저장
+                await self._finish(job_id, status=STATUS_SUCCEEDED, result=result, error=None)
+            raise
+        finally:
+            heartbeat.cancel()
+
+        await self._finish(job_id, status=STATUS_SUCCEEDED, result=result, error=None)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_one(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[ERROR] job {job_id} 처리 중 오류: {e}", flush=True)
+
+
+# 앱 전체에서 공유하는 job 큐 (main.py startup/shutdown 에서 start/stop)
+job_queue = JobQueue()
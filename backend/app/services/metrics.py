@@ -0,0 +1,288 @@
+# app/services/metrics.py
+from __future__ import annotations
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple, Union
+
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+
+# Prometheus text 포맷(/metrics)으로 내보내는 가벼운 메트릭 모음.
+# - 외부 라이브러리 없이 Counter / Histogram / (콜백) Gauge 만 지원
+# - 값 갱신은 lock + dict 연산 몇 번이라 운영에서 켜 둬도 부담 없음
+# - KoBART 는 쓰레드 풀에서 돌기 때문에 모든 갱신은 thread-safe
+
+# 지연 시간용 기본 버킷 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """HELP/TYPE 줄을 뺀 값 줄들."""
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label 값 -> [버킷별 개수..., +Inf 개수], 합계
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+GaugeValue = Union[float, Dict[LabelValues, float]]
+
+
+class CallbackGauge(_Metric):
+    """
+    /metrics 요청 시점에 콜백으로 값을 읽는 Gauge (큐 깊이, 커넥션 풀 등).
+    콜백은 숫자 하나, 또는 labelnames 순서의 label 값 tuple -> 숫자 dict 를 반환.
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], GaugeValue],
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        try:
+            value = self.callback()
+        except Exception:
+            # 수집 실패가 /metrics 전체를 깨뜨리지 않도록 해당 값만 생략
+            return []
+        if not isinstance(value, dict):
+            value = {(): value}
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(float(v))}"
+            for key, v in value.items()
+        ]
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render_latest() -> str:
+    """등록된 모든 메트릭을 Prometheus text 포맷(0.0.4)으로."""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        body = metric.render()
+        if body:
+            lines.extend(metric.header())
+            lines.extend(body)
+    return "\n".join(lines) + "\n"
+
+
+def metrics_response() -> PlainTextResponse:
+    """GET /metrics 응답 (API 서버 / 추론 서버 공통)."""
+    return PlainTextResponse(render_latest(), media_type="text/plain; version=0.0.4")
+
+
+# -------------------- 앱 공통 메트릭 --------------------
+
+HTTP_REQUESTS = Counter(
+    "aiary_http_requests_total",
+    "HTTP 요청 수",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "aiary_http_request_duration_seconds",
+    "HTTP 요청 처리 시간 (응답 본문 전송 완료까지)",
+    ["method", "route"],
+)
+
+# 엔드포인트 내부 단계별 시간 (업로드 저장, 전처리, 비전 호출, DB commit, 토큰화, generate ...)
+STAGE_LATENCY = Histogram(
+    "aiary_stage_duration_seconds",
+    "요청 처리 단계별 소요 시간",
+    ["stage"],
+)
+
+OPENAI_LATENCY = Histogram(
+    "aiary_openai_request_duration_seconds",
+    "OpenAI chat.completions 호출 시간 (동시 요청 제한 대기 제외)",
+    ["operation"],
+)
+OPENAI_ERRORS = Counter(
+    "aiary_openai_errors_total",
+    "OpenAI 호출 실패 수",
+    ["operation", "error"],
+)
+
+KOBART_TOKENS = Counter(
+    "aiary_kobart_generated_tokens_total",
+    "KoBART 가 생성한 토큰 수 (rate() 로 초당 토큰 수 확인)",
+)
+KOBART_MEMO_HITS = Counter(
+    "aiary_kobart_memo_hits_total",
+    "결정적 프리셋 메모로 generate 를 건너뛴 수",
+    ["preset"],
+)
+KOBART_TOKENS_PER_SECOND = Histogram(
+    "aiary_kobart_generate_tokens_per_second",
+    "KoBART generate 배치 1회의 초당 생성 토큰 수",
+    buckets=(5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """with stage_timer("vision"): ... 형태로 단계 시간을 기록."""
+    if not settings.METRICS_ENABLED:
+        yield
+        return
+    with STAGE_LATENCY.time(stage=stage):
+        yield
+
+
+class MetricsMiddleware:
+    """
+    요청 수 / 처리 시간을 기록하는 ASGI 미들웨어.
+    label 이 무한히 늘지 않도록 실제 경로 대신 라우트 경로(/jobs/{job_id})를 사용.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def _send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            route = scope.get("route")
+            if route is not None:
+                route_path = getattr(route, "path", "other")
+            elif scope.get("path", "").startswith("/media/"):
+                route_path = "/media"
+            else:
+                route_path = "other"
+            method = scope.get("method", "")
+            HTTP_LATENCY.observe(time.perf_counter() - start, method=method, route=route_path)
+            HTTP_REQUESTS.inc(method=method, route=route_path, status=str(status_code))
@@ -0,0 +1,238 @@
+# app/services/one_line_cache.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.model import OneLineDiaryCache
+from app.services import ai_generator
+
+# 1) 캐시 키
+
+def make_cache_key(image_data: bytes, user_prompt: str, mime_type: str) -> str:
+    """
+    정규화된(전처리 후) 이미지 바이트 + 프롬프트 + 모델 파라미터로 만든 sha256 키.
+    프롬프트나 모델 설정이 바뀌면 키도 바뀌므로 예전 결과가 섞이지 않음.
+    """
+    h = hashlib.sha256()
+    h.update(image_data)
+    for part in (
+        mime_type,
+        user_prompt,
+        ai_generator.ONE_LINE_SYSTEM_PROMPT,
+        ai_generator.MODEL_NAME,
+        str(ai_generator.MAX_TOKENS),
+        str(ai_generator.TEMPERATURE),
+    ):
+        h.update(b"\x00")
+        h.update(part.encode("utf-8"))
+    return h.hexdigest()
+
+
+# 2) 프로세스 내 LRU (1차 캐시)
+
+class LRUCache:
+    """크기가 제한된 간단한 LRU 캐시 (event loop 안에서만 사용)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, str] = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_memory_cache = LRUCache(settings.ONE_LINE_CACHE_SIZE)
+
+# 같은 키로 동시에 들어온 요청(클라이언트 재시도 등)은 비전 호출 1번을 공유
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+# 3) DB (2차 캐시)
+
+async def _load_from_db(db: AsyncSession, cache_key: str) -> Optional[str]:
+    result = await db.execute(
+        select(OneLineDiaryCache.content).where(OneLineDiaryCache.cache_key == cache_key)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _save_to_db(db: AsyncSession, cache_key: str, content: str) -> None:
+    """
+    같은 키가 동시에 저장될 수 있으므로 충돌 시 무시(ON CONFLICT DO NOTHING).
+    commit 은 호출한 쪽(Diary 저장과 같은 트랜잭션)에서 수행.
+    """
+    dialect = db.get_bind().dialect.name
+    values = {"cache_key": cache_key, "content": content}
+
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        await db.merge(OneLineDiaryCache(**values))
+        return
+
+    stmt = insert(OneLineDiaryCache).values(**values).on_conflict_do_nothing(
+        index_elements=["cache_key"]
+    )
+    await db.execute(stmt)
+
+
+class _LeaderCancelled(Exception):
+    """먼저 생성하던 요청이 취소됨 -> 기다리던 요청이 직접 생성하도록 알림."""
+
+
+async def _generate_shared(cache_key: str, generate: Callable[[], Awaitable[str]]) -> tuple[str, bool]:
+    """
+    같은 키로 이미 생성 중이면 그 결과를 기다리고, 아니면 generate() 실행.
+    먼저 생성하던 요청이 취소되면 기다리던 요청이 이어서 직접 생성함.
+    반환: (한 줄 일기, 다른 요청의 결과를 공유했는지 여부)
+    """
+    while True:
+        pending = _inflight.get(cache_key)
+        if pending is None:
+            break
+        try:
+            return await asyncio.shield(pending), True
+        except _LeaderCancelled:
+            continue
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[cache_key] = future
+    try:
+        content = await generate()
+    except BaseException as e:
+        # future.cancel() 을 하면 기다리던 쪽에 CancelledError 가 전파되어
+        # 그 요청(작업 큐 워커 등)까지 취소된 것처럼 끝나므로 예외로 전달
+        future.set_exception(_LeaderCancelled() if isinstance(e, asyncio.CancelledError) else e)
+        # 기다리는 쪽이 없으면 "exception was never retrieved" 경고 방지
+        future.exception()
+        raise
+    else:
+        future.set_result(content)
+    finally:
+        _inflight.pop(cache_key, None)
+    return content, False
+
+
+# 4) 엔드포인트에서 쓸 함수
+
+async def get_or_generate_one_line(
+    db: AsyncSession,
+    cache_key: str,
+    generate: Callable[[], Awaitable[str]],
+) -> tuple[str, bool]:
+    """
+    LRU -> DB -> 실제 생성(generate) 순서로 한 줄 일기를 찾음.
+    반환: (한 줄 일기, 캐시 적중 여부)
+    """
+    if not settings.ONE_LINE_CACHE_ENABLED:
+        return await generate(), False
+
+    cached = _memory_cache.get(cache_key)
+    if cached is not None:
+        return cached, True
+
+    cached = await _load_from_db(db, cache_key)
+    if cached is not None:
+        _memory_cache.set(cache_key, cached)
+        return cached, True
+
+    content, shared = await _generate_shared(cache_key, generate)
+    if shared:
+        return content, True
+
+    await _save_to_db(db, cache_key, content)
+    _memory_cache.set(cache_key, content)
+    return content, False
+
+
+# 5) 여러 장을 한 번에 처리할 때 (일괄 업로드)
+#    하나의 AsyncSession 은 동시에 쓸 수 없으므로
+#    DB 조회/저장은 한 번에 모아서 하고, 생성만 동시에 실행
+
+async def lookup_many(db: AsyncSession, cache_keys: List[str]) -> Dict[str, str]:
+    """LRU 와 DB(IN 쿼리 1번)에서 찾은 키 -> 한 줄 일기."""
+    if not settings.ONE_LINE_CACHE_ENABLED:
+        return {}
+
+    found: Dict[str, str] = {}
+    missing = []
+    for key in dict.fromkeys(cache_keys):
+        cached = _memory_cache.get(key)
+        if cached is not None:
+            found[key] = cached
+        else:
+            missing.append(key)
+
+    if missing:
+        result = await db.execute(
+            select(OneLineDiaryCache.cache_key, OneLineDiaryCache.content)
+            .where(OneLineDiaryCache.cache_key.in_(missing))
+        )
+        for key, content in result.all():
+            _memory_cache.set(key, content)
+            found[key] = content
+    return found
+
+
+async def generate_one_line(cache_key: str, generate: Callable[[], Awaitable[str]]) -> tuple[str, bool]:
+    """
+    DB 를 건드리지 않는 생성 단계 (동시 실행 가능).
+    같은 키로 생성 중인 요청이 있으면 결과를 공유.
+    반환: (한 줄 일기, 새로 생성해서 save_many 로 저장해야 하는지 여부)
+    LRU 에는 넣지 않음 (commit 이 끝난 뒤 remember_many 로)
+    """
+    if not settings.ONE_LINE_CACHE_ENABLED:
+        return await generate(), False
+
+    # 다른 요청이 그 사이 저장을 끝냈으면 그 결과 사용
+    cached = _memory_cache.get(cache_key)
+    if cached is not None:
+        return cached, False
+
+    content, shared = await _generate_shared(cache_key, generate)
+    return content, not shared
+
+
+async def save_many(db: AsyncSession, entries: Dict[str, str]) -> None:
+    """새로 생성한 결과들을 DB 캐시에 추가 (commit 은 호출한 쪽에서 Diary 들과 함께)."""
+    for cache_key, content in entries.items():
+        await _save_to_db(db, cache_key, content)
+
+
+def remember_many(entries: Dict[str, str]) -> None:
+    """save_many 로 저장한 결과를 commit 이 성공한 뒤 LRU 에 반영."""
+    if not settings.ONE_LINE_CACHE_ENABLED:
+        return
+    for cache_key, content in entries.items():
+        _memory_cache.set(cache_key, content)
+
+
+def clear_memory_cache() -> None:
+    """프로세스 내 LRU 캐시 비우기 (프롬프트 교체 등 운영용)."""
+    _memory_cache.clear()
@@ -1,30 +1,78 @@
 # app/services/security.py
 
+from anyio import CapacityLimiter, to_thread
 from passlib.context import CryptContext
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi import Security, HTTPException, status
+from fastapi import Depends, Security, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import Optional
+from typing import Optional, Tuple
 from app.config import settings
 from app.db.database import get_db_session
 from app.db.model import User
 
 # -------------------- Hashing Context --------------------
 # bcrypt 스키마를 명시하여 UnknownHashError를 해결합니다.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max_rounds 를 BCRYPT_ROUNDS 로 고정해서, cost 가 다른 기존 해시는
+# 로그인 시 verify_and_update 가 새 해시를 돌려주도록 합니다.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt 전용 쓰레드 수 제한 (최초 1회만 생성)
+_hash_limiter: Optional[CapacityLimiter] = None
+
+
+def _get_hash_limiter() -> CapacityLimiter:
+    global _hash_limiter
+
+    if _hash_limiter is None:
+        _hash_limiter = CapacityLimiter(settings.PASSWORD_HASH_WORKERS)
+    return _hash_limiter
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """평문 비밀번호와 해시된 비밀번호를 비교합니다."""
     # passlib.context.verify 함수는 정상적인 bcrypt 해시 포맷을 요구합니다.
-    print(f"\n[DEBUG_AUTH] Received Pass: '{plain_password}' | Stored Hash: {hashed_password}\n")
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """비밀번호를 해시하여 저장합니다."""
     return pwd_context.hash(password)
 
+
+# bcrypt 는 한 번에 100~300ms CPU 를 쓰므로 async 핸들러에서는 아래 함수를 사용합니다.
+# (쓰레드 풀에서 실행, 동시 실행 수는 PASSWORD_HASH_WORKERS 로 제한)
+
+async def hash_password_async(password: str) -> str:
+    return await to_thread.run_sync(
+        get_password_hash, password, limiter=_get_hash_limiter()
+    )
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    비밀번호 검증 + (BCRYPT_ROUNDS 가 바뀌었으면) 새 해시 생성.
+    반환: (일치 여부, 다시 저장할 새 해시 또는 None)
+    """
+    return await to_thread.run_sync(
+        pwd_context.verify_and_update,
+        plain_password,
+        hashed_password,
+        limiter=_get_hash_limiter(),
+    )
+
 # -------------------- JWT Generation --------------------
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -58,43 +106,127 @@ def decode_access_token(token: str):
     except JWTError:
         return None
 
-# [참고] FastAPI 의존성 함수: 토큰을 검증하고 현재 사용자 객체를 반환합니다.
-# 이 함수는 users.py 등에서 @Depends(get_current_user) 형태로 사용됩니다.
-security = HTTPBearer()
+# -------------------- 현재 사용자 (FastAPI 의존성) --------------------
 
-async def get_current_user(
-    token: HTTPAuthorizationCredentials = Security(security),
-    db: Optional[get_db_session] = None # 여기서 get_db_session을 사용하도록 수정 필요
-) -> User:
-    # 1. 토큰 디코딩
-    payload = decode_access_token(token.credentials)
+@dataclass(frozen=True)
+class CurrentUser:
+    """토큰으로 확인한 사용자 (세션과 무관하게 캐시할 수 있도록 ORM 객체 대신 사용)."""
+    id: int
+    email: str
+
+
+# user_id -> (만료 시각, CurrentUser)
+# 일기 API 마다 users 테이블을 다시 조회하지 않도록 AUTH_USER_CACHE_TTL 동안 재사용
+_user_cache: "OrderedDict[int, Tuple[float, CurrentUser]]" = OrderedDict()
+
+
+def _cache_get(user_id: int) -> Optional[CurrentUser]:
+    entry = _user_cache.get(user_id)
+    if entry is None:
+        return None
+    expires_at, user = entry
+    if expires_at < time.monotonic():
+        _user_cache.pop(user_id, None)
+        return None
+    _user_cache.move_to_end(user_id)
+    return user
+
+
+def _cache_set(user: CurrentUser) -> None:
+    if settings.AUTH_USER_CACHE_TTL <= 0 or settings.AUTH_USER_CACHE_SIZE <= 0:
+        return
+    _user_cache[user.id] = (time.monotonic() + settings.AUTH_USER_CACHE_TTL, user)
+    _user_cache.move_to_end(user.id)
+    while len(_user_cache) > settings.AUTH_USER_CACHE_SIZE:
+        _user_cache.popitem(last=False)
+
+
+def invalidate_cached_user(user_id: Optional[int] = None) -> None:
+    """사용자 정보가 바뀌거나 삭제되면 호출 (user_id 없이 부르면 전체 비움)."""
+    if user_id is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(user_id, None)
+
+
+def _credentials_error(detail: str = "Invalid authentication credentials") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+# 토큰이 없을 때 여기서 바로 403 을 내지 않고 아래 함수에서 판단
+security = HTTPBearer(auto_error=False)
+
+
+async def _resolve_user(token: str, db: AsyncSession) -> CurrentUser:
+    # 1. 토큰 디코딩 (요청당 한 번)
+    payload = decode_access_token(token)
     if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
+        raise _credentials_error()
+
     # 2. User ID 추출
-    user_id = payload.get("sub")
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise _credentials_error()
+
+    # 3. 캐시 -> 없으면 DB에서 사용자 조회
+    user = _cache_get(user_id)
+    if user is not None:
+        return user
+
+    result = await db.execute(select(User.id, User.email).where(User.id == user_id))
+    row = result.first()
+    if row is None:
+        raise _credentials_error("User not found")
+
+    user = CurrentUser(id=row.id, email=row.email)
+    _cache_set(user)
+    return user
+
+
+async def get_current_user(
+    token: Optional[HTTPAuthorizationCredentials] = Security(security),
+    db: AsyncSession = Depends(get_db_session),
+) -> CurrentUser:
+    """Bearer 토큰 필수. 토큰이 없거나 잘못되었으면 401."""
+    if token is None:
+        raise _credentials_error("Not authenticated")
+    return await _resolve_user(token.credentials, db)
+
+
+async def get_optional_user(
+    token: Optional[HTTPAuthorizationCredentials] = Security(security),
+    db: AsyncSession = Depends(get_db_session),
+) -> Optional[CurrentUser]:
+    """
+    토큰이 있으면 검증해서 사용자를 반환 (잘못된 토큰은 401).
+    토큰이 없으면 AUTH_REQUIRED 일 때만 401, 아니면 None.
+    """
+    if token is None:
+        if settings.AUTH_REQUIRED:
+            raise _credentials_error("Not authenticated")
+        return None
+    return await _resolve_user(token.credentials, db)
+
+
+def resolve_user_id(current_user: Optional[CurrentUser], user_id: Optional[int]) -> int:
+    """
+    요청이 다룰 user_id 결정.
+    - 토큰이 있으면 토큰의 사용자 (요청의 user_id 가 다르면 403)
+    - 토큰이 없으면 (AUTH_REQUIRED=False 일 때) 요청의 user_id
+    """
+    if current_user is not None:
+        if user_id is not None and user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="다른 사용자의 일기에는 접근할 수 없습니다.",
+            )
+        return current_user.id
+
     if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    # 3. DB에서 사용자 조회
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database session not available")
-    
-    result = await db.execute(select(User).filter(User.id == int(user_id)))
-    user = result.scalars().first()
-    
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return user
\ No newline at end of file
+        raise HTTPException(status_code=400, detail="user_id 가 필요합니다.")
+    return user_id
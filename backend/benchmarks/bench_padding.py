@@ -0,0 +1,118 @@
+# benchmarks/bench_padding.py
+"""
+KoBART 입력 padding 방식 비교 벤치마크.
+
+models/outputs/one_line_pairs.jsonl 의 한 줄 일기를 3~5개씩 뽑아 '하루'를 만들고,
+기존 고정 padding(max_length=256)과 동적 padding(길이 버킷 + longest)을
+같은 시드로 돌려서 지연 시간 / 처리량을 비교한다.
+
+실행 (backend 폴더에서):
+    python -m benchmarks.bench_padding
+    python -m benchmarks.bench_padding --model-dir /path/to/model --batch-sizes 1 4 8
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import List
+
+import torch
+
+from app.services import daily_diary_generator as gen
+
+# 저장소 루트의 models/outputs (backend/ 의 상위 폴더)
+DEFAULT_DATA = Path(__file__).resolve().parents[2] / "models" / "outputs" / "one_line_pairs.jsonl"
+
+
+def load_days(path: Path, n_days: int, seed: int = 0) -> List[str]:
+    """
+    한 줄 일기 풀에서 3~5개씩 뽑아 '하루' n_days 개를 만들고,
+    generate 입력(요약 문자열) 리스트로 돌려줌.
+    """
+    lines = []
+    with open(path, encoding="utf-8") as f:
+        for row in f:
+            row = row.strip()
+            if row:
+                lines.append(json.loads(row)["one_line"])
+
+    rng = random.Random(seed)
+    days = []
+    for _ in range(n_days):
+        chunk = [rng.choice(lines) for _ in range(rng.randint(3, 5))]
+        days.append(gen.build_summary_bullets(chunk)["combined_summary"])
+    return days
+
+
+def input_lengths(summaries: List[str]) -> List[int]:
+    texts = [f"[SUMMARY]\n{s}\n[DIARY]" for s in summaries]
+    enc = gen._tokenizer(texts, max_length=gen.MAX_INPUT_LEN, truncation=True)
+    return [len(ids) for ids in enc["input_ids"]]
+
+
+def run(summaries: List[str], padding: str, batch_size: int, max_len: int, seed: int) -> dict:
+    torch.manual_seed(seed)
+    latencies = []
+    started = time.perf_counter()
+    for i in range(0, len(summaries), batch_size):
+        batch = summaries[i:i + batch_size]
+        t0 = time.perf_counter()
+        gen.generate_diaries_from_summaries(batch, max_len=max_len, padding=padding)
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "padding": padding,
+        "batch_size": batch_size,
+        "batches": len(latencies),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "throughput_rps": len(summaries) / total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KoBART padding benchmark")
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA)
+    parser.add_argument("--model-dir", type=Path, default=None)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--max-len", type=int, default=gen.MAX_TARGET_LEN)
+    parser.add_argument("--days", type=int, default=32, help="만들 '하루' 개수")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.model_dir is not None:
+        gen.MODEL_DIR = args.model_dir
+    gen._load_model_if_needed()
+
+    summaries = load_days(args.data, args.days, seed=args.seed)
+    lengths = input_lengths(summaries)
+    print(
+        f"[INFO] days={len(summaries)} input tokens: "
+        f"mean={statistics.mean(lengths):.1f} max={max(lengths)} (fixed padding={gen.MAX_INPUT_LEN})"
+    )
+
+    # 첫 forward 오버헤드가 결과에 섞이지 않도록 한 번 돌려둠
+    gen.generate_diaries_from_summaries(summaries[:1], max_len=8, padding="longest")
+
+    results = []
+    for batch_size in args.batch_sizes:
+        for padding in ("max_length", "longest"):
+            results.append(run(summaries, padding, batch_size, args.max_len, args.seed))
+
+    print(f"{'padding':<11} {'batch':>5} {'p50(ms)':>9} {'p95(ms)':>9} {'mean(ms)':>9} {'req/s':>7}")
+    for r in results:
+        print(
+            f"{r['padding']:<11} {r['batch_size']:>5} {r['p50_ms']:>9.1f} "
+            f"{r['p95_ms']:>9.1f} {r['mean_ms']:>9.1f} {r['throughput_rps']:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# benchmarks/bench_scheduler.py
+"""
+KoBART generate 슬롯 수 / torch 쓰레드 수 조합별 처리량-지연 시간 곡선.
+
+설정 하나(슬롯 수 x intra-op 쓰레드 수)마다 새 프로세스를 띄워서
+(torch 쓰레드 설정은 프로세스 전역이라 같은 프로세스에서 바꿔가며 잴 수 없음)
+배칭 엔진(engine.submit)에 동시 요청 수를 늘려가며 요청을 넣고 req/s 와 p50/p95 를 잰다.
+
+기본 조합은 코어 수(C)에 맞춰 1xC, 2x(C/2), ... , Cx1 과
+과다 구독 비교용 CxC(슬롯 C개가 각각 코어 수만큼의 쓰레드로 연산할 수 있는 경우)이다.
+슬롯 효과만 보도록 기본 배치 크기는 1 (--batch-size 로 변경).
+
+실행 (backend 폴더에서):
+    python -m benchmarks.bench_scheduler --tiny
+    python -m benchmarks.bench_scheduler --configs 1x8,2x4,4x2,8x1,8x8 --concurrency 1 4 8 16
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# 저장소 루트의 models/outputs (backend/ 의 상위 폴더)
+DEFAULT_DATA = Path(__file__).resolve().parents[2] / "models" / "outputs" / "one_line_pairs.jsonl"
+
+
+def default_configs() -> List[Tuple[int, int]]:
+    cores = os.cpu_count() or 1
+    configs = []
+    slots = 1
+    while slots <= cores:
+        configs.append((slots, max(1, cores // slots)))
+        slots *= 2
+    if cores > 1:
+        configs.append((cores, cores))
+    return configs
+
+
+def parse_configs(text: str) -> List[Tuple[int, int]]:
+    """ "1x8,2x4" -> [(1, 8), (2, 4)] """
+    configs = []
+    for part in text.split(","):
+        slots, threads = part.strip().lower().split("x")
+        configs.append((int(slots), int(threads)))
+    return configs
+
+
+# ---------- 측정 프로세스 (--worker) ----------
+
+async def _measure(summaries: List[str], concurrency: int, max_len: int) -> dict:
+    from app.services import daily_diary_generator as gen
+
+    # 메모를 거치지 않도록 엔진에 바로 넣음
+    key = (gen.resolve_preset(None), max_len)
+
+    latencies: List[float] = []
+    next_index = 0
+
+    async def _client():
+        nonlocal next_index
+        while next_index < len(summaries):
+            summary = summaries[next_index]
+            next_index += 1
+            t0 = time.perf_counter()
+            await gen.engine.submit(summary, key=key)
+            latencies.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_client() for _ in range(concurrency)))
+    total = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "throughput_rps": len(latencies) / total,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+    }
+
+
+async def _worker_main(args) -> List[dict]:
+    # settings 가 환경변수를 읽은 뒤에 import 되도록 여기서 import
+    from app.services import daily_diary_generator as gen
+    from benchmarks.bench_padding import load_days
+
+    # 모델 로드 + 첫 forward 를 generate 쓰레드에서 미리 치름
+    await gen.scheduler.run(gen.warm_up)
+    summaries = load_days(args.data, args.requests, seed=args.seed)
+
+    results = []
+    try:
+        for concurrency in args.concurrency:
+            results.append(await _measure(summaries, concurrency, args.max_len))
+    finally:
+        await gen.shutdown()
+    return results
+
+
+# ---------- 조합별로 측정 프로세스 실행 ----------
+
+def run_config(args, slots: int, threads: int, model_dir: Path) -> List[dict]:
+    env = {
+        **os.environ,
+        "KOBART_GENERATE_SLOTS": str(slots),
+        "KOBART_INTRA_OP_THREADS": str(threads),
+        "KOBART_MAX_BATCH_SIZE": str(args.batch_size),
+        "KOBART_MODEL_DIR": str(model_dir),
+        # 다른 .env 설정(원격 추론 서버 등)에 영향받지 않게
+        "KOBART_INFERENCE_URL": "",
+        "KOBART_EAGER_LOAD": "false",
+    }
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        out_path = Path(f.name)
+    try:
+        cmd = [
+            sys.executable, "-m", "benchmarks.bench_scheduler", "--worker",
+            "--out", str(out_path),
+            "--data", str(args.data),
+            "--requests", str(args.requests),
+            "--max-len", str(args.max_len),
+            "--seed", str(args.seed),
+            "--concurrency", *map(str, args.concurrency),
+        ]
+        subprocess.run(cmd, cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+        return json.loads(out_path.read_text())
+    finally:
+        out_path.unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KoBART generate slots / torch threads benchmark")
+    parser.add_argument("--configs", type=parse_configs, default=None,
+                        help="슬롯수x쓰레드수 목록 (예: 1x8,2x4,4x2,8x1)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="동시에 요청을 보내는 클라이언트 수")
+    parser.add_argument("--requests", type=int, default=32, help="동시 요청 수 단계마다 보낼 요청 수")
+    parser.add_argument("--batch-size", type=int, default=1, help="KOBART_MAX_BATCH_SIZE")
+    parser.add_argument("--max-len", type=int, default=None)
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA)
+    parser.add_argument("--model-dir", type=Path, default=None)
+    parser.add_argument("--tiny", action="store_true", help="benchmarks.tiny_model 로 만든 작은 모델 사용")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--out", type=Path, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        if args.max_len is None:
+            from app.services.daily_diary_generator import MAX_TARGET_LEN
+            args.max_len = MAX_TARGET_LEN
+        results = asyncio.run(_worker_main(args))
+        args.out.write_text(json.dumps(results))
+        return
+
+    with tempfile.TemporaryDirectory(prefix="aiary-bench-") as workdir:
+        model_dir = args.model_dir
+        if args.tiny:
+            from benchmarks.tiny_model import build_tiny_model
+            model_dir = build_tiny_model(Path(workdir) / "tiny", data=args.data)
+        if model_dir is None:
+            from app.services.daily_diary_generator import MODEL_DIR
+            model_dir = MODEL_DIR
+        if args.max_len is None:
+            # 학습 안 된 작은 모델은 대부분 max_len 까지 생성하므로 짧게
+            args.max_len = 64 if args.tiny else 220
+
+        configs = args.configs or default_configs()
+        rows = []
+        for slots, threads in configs:
+            print(f"[INFO] slots={slots} intra_op_threads={threads} 측정 중...", file=sys.stderr, flush=True)
+            for r in run_config(args, slots, threads, model_dir):
+                rows.append({"slots": slots, "intra_op_threads": threads, **r})
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+
+    print(f"[INFO] cpu_count={os.cpu_count()} batch_size={args.batch_size} "
+          f"requests={args.requests} max_len={args.max_len}")
+    print(f"{'slots':>5} {'threads':>7} {'conc':>5} {'req/s':>8} {'p50(ms)':>9} {'p95(ms)':>9}")
+    for r in rows:
+        print(
+            f"{r['slots']:>5} {r['intra_op_threads']:>7} {r['concurrency']:>5} "
+            f"{r['throughput_rps']:>8.2f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
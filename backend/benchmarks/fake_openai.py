@@ -0,0 +1,141 @@
+# benchmarks/fake_openai.py
+"""
+부하 테스트용 가짜 OpenAI 호환 서버 (POST /v1/chat/completions 만 지원).
+
+실제 API 대신 지정한 지연 시간만큼 기다렸다가 고정 문구를 돌려줘서,
+네트워크 / 요금 없이 OpenAI 호출이 섞인 엔드포인트의 처리량을 잴 수 있다.
+앱 쪽에서는 OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 로 지정하면 된다.
+
+stream=true 요청에는 chat.completion.chunk SSE 로 단어 단위 조각을 보낸다.
+
+실행 (backend 폴더에서):
+    python -m benchmarks.fake_openai --port 8900 --latency-ms 800 --jitter-ms 300
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ONE_LINE_REPLIES = [
+    "따뜻한 햇살 아래 까르르 웃음이 번진 오후🌞",
+    "처음 잡아본 숟가락, 오늘은 내가 먹을래요🥄",
+    "바람개비 따라 뛰어다닌 신나는 산책길🌬️",
+    "포근한 이불 속에서 꿈나라로 출발🌙",
+]
+
+SUMMARY_REPLY = (
+    "오늘은 아이와 함께한 작은 순간들이 유난히 반짝였던 하루였다. "
+    "햇살 좋은 오후에는 산책을 나가 한참을 웃었고, 저녁에는 포근한 이불 속에서 "
+    "하루를 마무리했다. 별일 없는 하루였지만 그래서 더 소중하게 느껴졌다."
+)
+
+
+def create_app(
+    latency_ms: float,
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    chunk_ms: float = 20.0,
+) -> FastAPI:
+    """
+    latency_ms ± jitter_ms 만큼 기다린 뒤 응답하는 앱.
+    error_rate 비율만큼은 500 을 돌려줌 (재시도 / 에러 경로 확인용).
+    stream=true 요청은 latency 후 첫 조각을 보내고, 이후 단어마다 chunk_ms 간격으로 보냄.
+    """
+    app = FastAPI(title="fake-openai")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+
+        delay = max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+
+        if error_rate and random.random() < error_rate:
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": "fake server error", "type": "server_error"}},
+            )
+
+        # 이미지가 들어 있으면 한 줄 일기, 아니면 하루 요약으로 간주
+        messages = body.get("messages", [])
+        has_image = any(
+            isinstance(m.get("content"), list)
+            and any(part.get("type") == "image_url" for part in m["content"])
+            for m in messages
+        )
+        content = random.choice(ONE_LINE_REPLIES) if has_image else SUMMARY_REPLY
+        completion_id = f"chatcmpl-{uuid4().hex}"
+        model = body.get("model", "fake")
+
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream_chunks(completion_id, model, content, chunk_ms),
+                media_type="text/event-stream",
+            )
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    return app
+
+
+async def _stream_chunks(completion_id: str, model: str, content: str, chunk_ms: float):
+    """chat.completion.chunk 형식의 SSE (단어 단위 조각 + 마지막 finish_reason + [DONE])."""
+
+    def _chunk(delta: dict, finish_reason=None) -> str:
+        data = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    yield _chunk({"role": "assistant", "content": ""})
+    words = content.split(" ")
+    for i, word in enumerate(words):
+        if i:
+            await asyncio.sleep(chunk_ms / 1000)
+        yield _chunk({"content": word if i == 0 else " " + word})
+    yield _chunk({}, finish_reason="stop")
+    yield "data: [DONE]\n\n"
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="fake OpenAI chat.completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--jitter-ms", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--chunk-ms", type=float, default=20.0, help="stream 응답의 조각 간격")
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.chunk_ms)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/tiny_model.py
+"""
+부하 테스트용 작은 랜덤 가중치 BART 생성.
+
+models/day_diary_from_summary_v2 와 같은 형식(PreTrainedTokenizerFast + BartForConditionalGeneration)
+으로 저장하지만, 토크나이저는 한 줄 일기 데이터로 바로 학습한 작은 BPE 이고
+모델은 학습하지 않은 d_model=64 짜리라 인터넷 / 실제 체크포인트 없이 몇 초 만에 만들어진다.
+(생성 결과는 의미 없는 문자열이지만 토큰화 -> generate -> decode 경로는 실제와 같음)
+
+실행 (backend 폴더에서):
+    python -m benchmarks.tiny_model /tmp/tiny_kobart
+    KOBART_MODEL_DIR=/tmp/tiny_kobart uvicorn main:app
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Iterator
+
+import torch
+from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+from transformers import BartConfig, BartForConditionalGeneration, PreTrainedTokenizerFast
+
+# 저장소 루트의 models/outputs (backend/ 의 상위 폴더)
+DEFAULT_DATA = Path(__file__).resolve().parents[2] / "models" / "outputs" / "one_line_pairs.jsonl"
+
+SPECIAL_TOKENS = ["<s>", "</s>", "<usr>", "<pad>", "<sys>", "<unk>", "<mask>"]
+
+# 생성 프롬프트에 들어가는 고정 문구도 어휘에 포함
+PROMPT_TEXTS = ["[SUMMARY]", "[DIARY]", "오늘의 주요 장면 요약:", "- "]
+
+
+def _corpus(path: Path) -> Iterator[str]:
+    yield from PROMPT_TEXTS
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8") as f:
+        for row in f:
+            row = row.strip()
+            if row:
+                yield json.loads(row)["one_line"]
+
+
+def build_tiny_model(
+    out_dir: Path,
+    data: Path = DEFAULT_DATA,
+    vocab_size: int = 2000,
+    d_model: int = 64,
+    layers: int = 2,
+    seed: int = 0,
+) -> Path:
+    """out_dir 에 토크나이저 + 랜덤 BART 를 save_pretrained 로 저장하고 경로를 반환."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    tok = Tokenizer(models.BPE(unk_token="<unk>"))
+    tok.pre_tokenizer = pre_tokenizers.Metaspace()
+    tok.decoder = decoders.Metaspace()
+    trainer = trainers.BpeTrainer(vocab_size=vocab_size, special_tokens=SPECIAL_TOKENS)
+    tok.train_from_iterator(_corpus(data), trainer=trainer)
+
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=tok,
+        bos_token="<s>",
+        eos_token="</s>",
+        unk_token="<unk>",
+        pad_token="<pad>",
+        mask_token="<mask>",
+    )
+
+    torch.manual_seed(seed)
+    config = BartConfig(
+        vocab_size=len(tokenizer),
+        d_model=d_model,
+        encoder_layers=layers,
+        decoder_layers=layers,
+        encoder_attention_heads=4,
+        decoder_attention_heads=4,
+        encoder_ffn_dim=d_model * 2,
+        decoder_ffn_dim=d_model * 2,
+        max_position_embeddings=1026,
+        pad_token_id=tokenizer.pad_token_id,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        decoder_start_token_id=tokenizer.eos_token_id,
+    )
+    model = BartForConditionalGeneration(config)
+    model.generation_config.forced_eos_token_id = tokenizer.eos_token_id
+
+    tokenizer.save_pretrained(str(out_dir))
+    model.save_pretrained(str(out_dir))
+    return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="부하 테스트용 작은 랜덤 BART 생성")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA)
+    parser.add_argument("--vocab-size", type=int, default=2000)
+    parser.add_argument("--d-model", type=int, default=64)
+    parser.add_argument("--layers", type=int, default=2)
+    args = parser.parse_args()
+
+    path = build_tiny_model(
+        args.out_dir, args.data, args.vocab_size, args.d_model, args.layers
+    )
+    print(f"[INFO] tiny BART 저장 완료: {path}")
+
+
+if __name__ == "__main__":
+    main()
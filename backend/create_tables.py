@@ -1,24 +1,42 @@
-# create_tables.py (최종본)
+# create_tables.py
+# 스키마는 alembic migration(migrations/versions)으로 관리합니다.
+#   python create_tables.py        -> head 까지 upgrade
+# (alembic 명령을 직접 써도 됨: alembic upgrade head / alembic revision -m "...")
 
 import asyncio
-# database에서 engine과 Base를 임포트합니다.
-from app.db.database import engine, Base 
-# models를 임포트하면 이미 Base에 모든 테이블이 등록됩니다.
-from app.db.model import User, Diary 
+from pathlib import Path
 
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
 
-async def create_db_and_tables():
-    # 🚨 테이블이 정상적으로 로드되었는지 확인합니다. (디버그 코드)
-    print(f"DEBUG: Base 메타데이터에 등록된 테이블 수: {len(Base.metadata.tables)}")
-    if not Base.metadata.tables:
-        print("FATAL ERROR: 테이블이 메모리에 로드되지 않았습니다. import 구조를 확인하세요.")
-        return 
+from app.db.database import engine
+
+ALEMBIC_INI = Path(__file__).resolve().parent / "alembic.ini"
+
+# create_all 시절에 만들어진 최초 스키마에 해당하는 revision
+BASELINE_REVISION = "0001"
+
+
+async def _is_unversioned_legacy_db() -> bool:
+    """create_all 로 테이블은 있는데 alembic_version 이 없는 DB 인지 확인."""
+    async with engine.connect() as conn:
+        tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+    # env.py 는 별도 event loop 에서 같은 엔진을 쓰므로 풀을 비워 둠
+    await engine.dispose()
+    return "users" in tables and "alembic_version" not in tables
+
+
+def upgrade_db() -> None:
+    cfg = Config(str(ALEMBIC_INI))
+
+    if asyncio.run(_is_unversioned_legacy_db()):
+        print(f"기존(create_all) DB 감지 -> revision {BASELINE_REVISION} 로 stamp")
+        command.stamp(cfg, BASELINE_REVISION)
+
+    command.upgrade(cfg, "head")
+    print("DB migration 완료!")
 
-    async with engine.begin() as conn:
-        print("새로운 테이블 생성 시작 (DDL 실행)...")
-        # Base에 등록된 모든 모델을 기반으로 테이블을 생성합니다.
-        await conn.run_sync(Base.metadata.create_all)
-        print("테이블 생성 완료!")
 
 if __name__ == "__main__":
-    asyncio.run(create_db_and_tables())
\ No newline at end of file
+    upgrade_db()
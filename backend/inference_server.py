@@ -0,0 +1,103 @@
+# inference_server.py
+# KoBART 하루일기 모델만 올려 두는 추론 전용 프로세스.
+#
+# uvicorn/gunicorn 워커를 여러 개 띄우면 워커마다 모델을 따로 로드해서 메모리가 워커 수만큼 늘고,
+# 워커들이 같은 CPU 코어를 두고 generate 를 동시에 돌리게 됨.
+# 이 프로세스를 하나 띄우고 API 쪽에 KOBART_INFERENCE_URL 을 지정하면
+# 모델은 여기 1벌만 로드되고, 모든 워커의 요청이 이 프로세스의 배칭 엔진 하나에 모인다.
+#
+#   uvicorn inference_server:app --uds /tmp/aiary-kobart.sock        (API: KOBART_INFERENCE_URL=unix:///tmp/aiary-kobart.sock)
+#   uvicorn inference_server:app --host 127.0.0.1 --port 9100        (API: KOBART_INFERENCE_URL=http://127.0.0.1:9100)
+#
+# 배칭 / 백엔드 / 쓰레드 설정(KOBART_MAX_BATCH_SIZE, KOBART_BACKEND, KOBART_GENERATE_SLOTS ...)은 이 프로세스의 환경변수가 적용됨.
+# 모델을 1벌만 두는 게 목적이므로 --workers 없이 1개로 실행.
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import asyncio
+import json
+
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from app.services import daily_diary_generator
+from app.services.daily_diary_generator import (
+    generate_summary_local,
+    resolve_preset,
+    stream_summary_local,
+)
+from app.services.metrics import metrics_response
+
+app = FastAPI(title="Aiary KoBART inference")
+
+
+class GenerateRequest(BaseModel):
+    summary: str                                   # build_summary_bullets 의 combined_summary
+    preset: Optional[str] = None                   # None 이면 이 프로세스의 KOBART_PRESET
+    max_len: Optional[int] = Field(None, ge=1, le=1024)   # None 이면 프리셋의 생성 길이 상한
+
+
+def _preset(payload: GenerateRequest) -> str:
+    try:
+        return resolve_preset(payload.preset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.on_event("startup")
+async def startup_event():
+    # 모델 로드 + 워밍업은 백그라운드로 (끝날 때까지 /health/ready 는 503)
+    app.state.warmup_task = asyncio.create_task(daily_diary_generator.warm_up_in_background())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await daily_diary_generator.shutdown()
+
+
+# 요청 1건 -> 배칭 엔진 (다른 워커에서 동시에 온 같은 프리셋 요청과 함께 배치로 묶임)
+@app.post("/generate")
+async def generate(payload: GenerateRequest):
+    text = await generate_summary_local(payload.summary, _preset(payload), payload.max_len)
+    return {"text": text}
+
+
+# 스트리밍 generate: 텍스트 조각마다 {"text": ...} 한 줄 (NDJSON), 실패하면 {"error": ...}
+@app.post("/generate/stream")
+async def generate_stream(payload: GenerateRequest):
+    preset = _preset(payload)
+
+    async def _lines():
+        try:
+            async for text in stream_summary_local(payload.summary, preset, payload.max_len):
+                yield json.dumps({"text": text}, ensure_ascii=False) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+# 이 프로세스는 항상 모델을 미리 로드하므로 워밍업이 끝나야 ready
+@app.get("/health/ready")
+def get_readiness():
+    status = daily_diary_generator.readiness()
+    status["eager_load"] = True
+    status["ready"] = status["warmup_state"] == "ready"
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/stats")
+def get_stats():
+    return daily_diary_generator.inference_stats()
+
+
+daily_diary_generator.register_engine_metrics()
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return metrics_response()
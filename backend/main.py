@@ -4,13 +4,21 @@ load_dotenv()
 
 
 
+import asyncio
 from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
-from app.api.endpoints import user, diary  # user, diary 라우터 둘 다 임포트
+from app.api.endpoints import user, diary, job, media  # 라우터 임포트
+from app.config import settings
+from app.db.database import pool_stats
+from app.services import daily_diary_generator, inference_client
+from app.services.ai_generator import close_client
+from app.services.http_cache import ImmutableStaticFiles
+from app.services.job_queue import job_queue
+from app.services.metrics import CallbackGauge, MetricsMiddleware, metrics_response
 
 # 앱 인스턴스 생성
 app = FastAPI(title="Aiary")
@@ -33,8 +41,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # GET /diaries/ 페이지네이션 cursor, 조건부 요청용 ETag
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
+# 요청 수 / 처리 시간 (GET /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # ---------------- /media 정적 파일 서빙 ----------------
 MEDIA_DIR = Path("media")
 IMAGES_DIR = MEDIA_DIR / "images"
@@ -45,20 +58,94 @@ async def startup_event():
     MEDIA_DIR.mkdir(exist_ok=True)
     IMAGES_DIR.mkdir(exist_ok=True)
 
+    # AI 생성 job 워커 시작 (?job=true 요청 처리)
+    await job_queue.start()
+
+    # KoBART 모델 미리 로드 + 워밍업 (opt-in)
+    # 서버는 바로 뜨고, 워밍업이 끝날 때까지 /health/ready 가 503을 반환
+    # (추론 프로세스를 따로 쓰면 모델은 그쪽에서 로드)
+    if settings.KOBART_EAGER_LOAD and not inference_client.is_remote():
+        app.state.warmup_task = asyncio.create_task(daily_diary_generator.warm_up_in_background())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # job 워커 종료 (처리 중이던 queued job 은 다음 startup 때 다시 처리)
+    await job_queue.stop()
+    # 공유 OpenAI 클라이언트의 커넥션 풀 정리
+    await close_client()
+    # KoBART 배칭 엔진 워커 + generate 쓰레드 풀 종료
+    await daily_diary_generator.shutdown()
+    # 추론 프로세스 연결 정리
+    await inference_client.close_client()
+
+
+# 사진 축소본: 없으면 첫 요청 때 생성해야 하므로 /media 마운트보다 먼저 등록
+# 예: http://127.0.0.1:9000/media/derived/thumb/xxx.webp
+app.include_router(media.router)
 
 # /media 로 시작하는 URL은 media 폴더에서 파일 서빙
 # 예: http://127.0.0.1:9000/media/images/xxx.jpg
-app.mount("/media", StaticFiles(directory=str(MEDIA_DIR)), name="media")
+# (파일명이 내용 해시인 사진은 Cache-Control: immutable 로 다시 받지 않게 함)
+app.mount("/media", ImmutableStaticFiles(directory=str(MEDIA_DIR)), name="media")
 
 # ---------------- 라우터 등록 ----------------
 app.include_router(user.router)
 app.include_router(diary.router)
+app.include_router(job.router)
 
 # ---------------- 기본 경로 ----------------
 @app.get("/")
 def read_root():
     return {"message": "안녕하세요! AIary 백엔드 서버입니다."}
 
+# readiness probe (KoBART 워밍업이 끝나야 200, 추론 프로세스를 쓰면 그쪽 상태)
+@app.get("/health/ready")
+async def get_readiness():
+    if inference_client.is_remote():
+        status = await inference_client.readiness()
+    else:
+        status = daily_diary_generator.readiness()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+# KoBART 배칭 엔진 상태 (큐 깊이, 평균 배치 크기 등 + generate 슬롯 사용량)
+@app.get("/inference/stats")
+async def get_inference_stats():
+    if inference_client.is_remote():
+        return await inference_client.stats()
+    return daily_diary_generator.inference_stats()
+
+# DB 커넥션 풀 사용량 (checked_out / utilization 등)
+@app.get("/db/pool/stats")
+def get_db_pool_stats():
+    return pool_stats()
+
+# ---------------- Prometheus 메트릭 ----------------
+# 큐 / 커넥션 풀처럼 "지금 상태"인 값은 /metrics 요청 시점에 읽음
+# (추론 프로세스를 따로 쓰면 KoBART 엔진 메트릭은 그쪽 /metrics 에서)
+if not inference_client.is_remote():
+    daily_diary_generator.register_engine_metrics()
+
+CallbackGauge(
+    "aiary_db_pool_connections",
+    "DB 커넥션 풀 연결 수 (state=checked_in/checked_out/overflow)",
+    lambda: {
+        (state,): pool_stats().get(state, 0)
+        for state in ("checked_in", "checked_out", "overflow")
+    },
+    labelnames=["state"],
+)
+CallbackGauge(
+    "aiary_db_pool_utilization",
+    "DB 커넥션 풀 사용률 (checked_out / (pool_size + max_overflow))",
+    lambda: pool_stats().get("utilization", 0.0),
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return metrics_response()
+
 # (예시) 일기 생성 API
 @app.get("/diary")
 def get_diary_example():
@@ -0,0 +1,74 @@
+"""one_line_diary_cache, daily_diaries, generation_jobs
+
+create_all 로 이미 만들어진 DB 도 있으므로 없는 테이블만 생성.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "one_line_diary_cache" not in existing:
+        op.create_table(
+            "one_line_diary_cache",
+            sa.Column("cache_key", sa.String(length=64), primary_key=True),
+            sa.Column("content", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+
+    if "daily_diaries" not in existing:
+        op.create_table(
+            "daily_diaries",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("diary_date", sa.Date(), nullable=False),
+            sa.Column("generator", sa.String(length=32), nullable=False),
+            sa.Column("source_fingerprint", sa.String(length=64), nullable=False),
+            sa.Column("source_count", sa.Integer(), nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.UniqueConstraint(
+                "user_id", "diary_date", "generator", name="uq_daily_diary_user_date_generator"
+            ),
+        )
+        op.create_index("ix_daily_diaries_id", "daily_diaries", ["id"])
+
+    if "generation_jobs" not in existing:
+        op.create_table(
+            "generation_jobs",
+            sa.Column("id", sa.String(length=32), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("kind", sa.String(length=32), nullable=False),
+            sa.Column("status", sa.String(length=16), nullable=False),
+            sa.Column("idempotency_key", sa.String(length=128), nullable=True),
+            sa.Column("payload", sa.JSON(), nullable=False),
+            sa.Column("result", sa.JSON(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.UniqueConstraint("user_id", "idempotency_key", name="uq_generation_job_idempotency"),
+        )
+        op.create_index("ix_generation_jobs_user_id", "generation_jobs", ["user_id"])
+        op.create_index("ix_generation_jobs_status", "generation_jobs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_generation_jobs_status", table_name="generation_jobs")
+    op.drop_index("ix_generation_jobs_user_id", table_name="generation_jobs")
+    op.drop_table("generation_jobs")
+    op.drop_index("ix_daily_diaries_id", table_name="daily_diaries")
+    op.drop_table("daily_diaries")
+    op.drop_table("one_line_diary_cache")
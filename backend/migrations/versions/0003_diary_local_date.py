@@ -0,0 +1,84 @@
+"""diaries.local_date + (user_id, created_at) / (user_id, local_date) 인덱스
+
+하루/기간 조회를 created_at 범위 스캔 대신 (user_id, local_date) equality 로 하기 위한 컬럼.
+기존 행은 DIARY_TIMEZONE 기준으로 채운 뒤 NOT NULL 로 바꿈.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+from app.db.model import to_local_date
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Postgres 가 아닐 때 Python 으로 채우는 배치 크기
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _backfill_local_date() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == "postgresql":
+        # created_at 은 UTC naive 로 저장되어 있음
+        bind.execute(
+            sa.text(
+                "UPDATE diaries SET local_date = "
+                "(created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz)::date "
+                "WHERE local_date IS NULL AND created_at IS NOT NULL"
+            ),
+            {"tz": settings.DIARY_TIMEZONE},
+        )
+    else:
+        diaries = sa.table(
+            "diaries",
+            sa.column("id", sa.Integer),
+            sa.column("created_at", sa.DateTime),
+            sa.column("local_date", sa.Date),
+        )
+        last_id = 0
+        while True:
+            rows = bind.execute(
+                sa.select(diaries.c.id, diaries.c.created_at)
+                .where(diaries.c.id > last_id)
+                .where(diaries.c.created_at.is_not(None))
+                .order_by(diaries.c.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                bind.execute(
+                    diaries.update()
+                    .where(diaries.c.id == row.id)
+                    .values(local_date=to_local_date(row.created_at))
+                )
+            last_id = rows[-1].id
+
+    # created_at 이 비어 있던 행(있다면)은 migration 날짜로 채움
+    bind.execute(sa.text("UPDATE diaries SET local_date = CURRENT_DATE WHERE local_date IS NULL"))
+
+
+def upgrade() -> None:
+    op.add_column("diaries", sa.Column("local_date", sa.Date(), nullable=True))
+    _backfill_local_date()
+
+    with op.batch_alter_table("diaries") as batch_op:
+        batch_op.alter_column("local_date", existing_type=sa.Date(), nullable=False)
+
+    op.create_index("ix_diaries_user_id_created_at", "diaries", ["user_id", "created_at"])
+    op.create_index("ix_diaries_user_id_local_date", "diaries", ["user_id", "local_date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_diaries_user_id_local_date", table_name="diaries")
+    op.drop_index("ix_diaries_user_id_created_at", table_name="diaries")
+    with op.batch_alter_table("diaries") as batch_op:
+        batch_op.drop_column("local_date")
@@ -0,0 +1,143 @@
+# scripts/convert_day_diary_model.py
+"""
+하루일기 KoBART 모델(models/day_diary_from_summary_v2)을 ONNX Runtime 용으로 변환하고,
+fp32 PyTorch / int8 PyTorch / ONNX Runtime 백엔드를 비교하는 스크립트.
+
+비교 항목
+  - 로드 후 증가한 메모리(RSS)
+  - 입력 1건당 generate 지연 시간
+  - fp32 결과 대비 출력 유사도 (greedy decoding 으로 비교)
+
+실행 (backend 폴더에서, optimum[onnxruntime] 필요):
+    python -m scripts.convert_day_diary_model
+    python -m scripts.convert_day_diary_model --skip-export --days 8
+"""
+from __future__ import annotations
+
+import argparse
+import difflib
+import gc
+import statistics
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import torch
+from transformers import PreTrainedTokenizerFast
+
+from app.services import daily_diary_generator as gen
+from benchmarks.bench_padding import DEFAULT_DATA, load_days
+
+
+def current_rss_mb() -> Optional[float]:
+    """현재 프로세스 RSS (MB). /proc 가 없는 OS 에서는 None."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def export_onnx(model_dir: Path, onnx_dir: Path) -> None:
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    print(f"[INFO] ONNX 변환 중: {model_dir} -> {onnx_dir}", flush=True)
+    model = ORTModelForSeq2SeqLM.from_pretrained(str(model_dir), export=True, use_cache=True)
+    model.save_pretrained(str(onnx_dir))
+    # onnx 디렉터리만 있어도 쓸 수 있도록 토크나이저도 함께 저장
+    PreTrainedTokenizerFast.from_pretrained(str(model_dir)).save_pretrained(str(onnx_dir))
+    print("[INFO] ONNX 변환 완료", flush=True)
+
+
+def generate_greedy(model, tokenizer, device, summaries: List[str], max_len: int) -> tuple[List[str], List[float]]:
+    """백엔드끼리 출력을 비교할 수 있도록 샘플링 없이 greedy 로 1건씩 생성."""
+    outputs, latencies = [], []
+    for summary in summaries:
+        enc = tokenizer(
+            f"[SUMMARY]\n{summary}\n[DIARY]",
+            max_length=gen.MAX_INPUT_LEN,
+            truncation=True,
+            return_tensors="pt",
+        )
+        t0 = time.perf_counter()
+        with torch.no_grad():
+            out = model.generate(
+                input_ids=enc["input_ids"].to(device),
+                attention_mask=enc["attention_mask"].to(device),
+                max_new_tokens=max_len,
+                min_length=40,
+                no_repeat_ngram_size=3,
+                repetition_penalty=2.0,
+                do_sample=False,
+                eos_token_id=tokenizer.eos_token_id,
+                pad_token_id=tokenizer.pad_token_id,
+            )
+        latencies.append(time.perf_counter() - t0)
+        text = tokenizer.decode(out[0], skip_special_tokens=True)
+        outputs.append(text.replace("[DIARY]", "").strip())
+    return outputs, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KoBART 하루일기 모델 ONNX 변환 + 백엔드 비교")
+    parser.add_argument("--model-dir", type=Path, default=gen.MODEL_DIR)
+    parser.add_argument("--onnx-dir", type=Path, default=gen.ONNX_MODEL_DIR)
+    parser.add_argument("--skip-export", action="store_true", help="이미 변환된 ONNX 모델 사용")
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA)
+    parser.add_argument("--days", type=int, default=16)
+    parser.add_argument("--max-len", type=int, default=gen.MAX_TARGET_LEN)
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        export_onnx(args.model_dir, args.onnx_dir)
+
+    tokenizer = PreTrainedTokenizerFast.from_pretrained(str(args.model_dir))
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    gen.MODEL_DIR = args.model_dir
+    summaries = load_days(args.data, args.days)
+
+    baseline: Optional[List[str]] = None
+    rows = []
+    for backend in gen.BACKENDS:
+        gc.collect()
+        rss_before = current_rss_mb()
+        model, device = gen.load_backend_model(backend, args.model_dir, args.onnx_dir)
+
+        # 첫 forward 오버헤드 제외 (가중치 페이지가 실제로 올라온 뒤 RSS 측정)
+        generate_greedy(model, tokenizer, device, summaries[:1], max_len=8)
+        rss_after = current_rss_mb()
+        outputs, latencies = generate_greedy(model, tokenizer, device, summaries, args.max_len)
+
+        if baseline is None:
+            baseline = outputs
+        similarity = [difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(baseline, outputs)]
+        exact = sum(a == b for a, b in zip(baseline, outputs)) / len(outputs)
+
+        rows.append({
+            "backend": backend,
+            "rss_mb": (rss_after - rss_before) if rss_before is not None else float("nan"),
+            "p50_ms": statistics.median(latencies) * 1000,
+            "mean_ms": statistics.mean(latencies) * 1000,
+            "similarity": statistics.mean(similarity),
+            "exact": exact,
+        })
+
+        del model
+        gc.collect()
+
+    print(f"{'backend':<8} {'+RSS(MB)':>9} {'p50(ms)':>9} {'mean(ms)':>9} {'sim':>6} {'exact':>6}")
+    for r in rows:
+        print(
+            f"{r['backend']:<8} {r['rss_mb']:>9.1f} {r['p50_ms']:>9.1f} {r['mean_ms']:>9.1f} "
+            f"{r['similarity']:>6.3f} {r['exact']:>6.2f}"
+        )
+    print("[INFO] sim/exact 는 pytorch(fp32) greedy 출력 대비 값입니다.")
+
+
+if __name__ == "__main__":
+    main()